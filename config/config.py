@@ -43,6 +43,9 @@ class Config:
     DB_NAME = os.getenv('DB_NAME', 'Bio_data')
     DB_USER = os.getenv('DB_USER', 'nju_bio')
     DB_PASSWORD = os.getenv('DB_PASSWORD', '980605Hyz')
+
+    # 环境评分配置：启用后尾部衰减使用 1/(1+10x) 有理近似代替指数函数
+    ENV_SCORE_FAST_TAIL = os.getenv('ENV_SCORE_FAST_TAIL', 'False').lower() == 'true'
     
     @classmethod
     def resolve_model_name(cls) -> str:
@@ -4,8 +4,9 @@
 定义数据库表结构和数据模型
 """
 
-from sqlalchemy import Column, Integer, String, Float, create_engine, text
+from sqlalchemy import Column, Index, Integer, String, Float, create_engine, func, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker
 import pandas as pd
 import os
@@ -28,6 +29,17 @@ class MicrobialComplementarity(Base):
                f"competition_index={self.competition_index}, " \
                f"complementarity_index={self.complementarity_index})>"
 
+
+# 名称表达式索引：与 ScoreMetabolicInteractionTool 中 lower(trim(...)) IN (...) 查询保持一致
+Index(
+    "ix_mc_deg_lower",
+    func.lower(func.trim(MicrobialComplementarity.degrading_microorganism)),
+)
+Index(
+    "ix_mc_comp_lower",
+    func.lower(func.trim(MicrobialComplementarity.complementary_microorganism)),
+)
+
 def init_database(database_url: str):
     """
     初始化数据库
@@ -39,6 +51,20 @@ def init_database(database_url: str):
     Base.metadata.create_all(engine)
     return engine
 
+def create_name_indexes(engine):
+    """
+    为已存在的互补性表补建名称表达式索引
+
+    create_all 只在建表时创建索引；表达式索引无法可靠反射，这里直接使用 IF NOT EXISTS。
+    PostgreSQL 上建索引需要表的所有权，因此只在导入数据或运维脚本中调用，查询工具启动时不调用。
+
+    Args:
+        engine: 数据库引擎
+    """
+    with engine.begin() as connection:
+        for index in MicrobialComplementarity.__table__.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
 def load_excel_data_to_db(database_url: str, excel_file_path: str):
     """
     将Excel数据加载到数据库
@@ -77,6 +103,7 @@ def load_excel_data_to_db(database_url: str, excel_file_path: str):
         
         session.commit()
         session.close()
+        create_name_indexes(engine)
         
         print(f"成功将 {len(df)} 条记录加载到数据库")
         return True
@@ -56,6 +56,7 @@ class SpeciesEnvironmentQueryTool(BaseTool):
     _PH_WEIGHT: float = 0.35
     _SALINITY_WEIGHT: float = 0.10
     _OXYGEN_WEIGHT: float = 0.20
+    _UNKNOWN_OXYGEN: tuple[str, ...] = ("", "unknown", "nan", "none")
 
     def __init__(self) -> None:
         super().__init__()
@@ -101,7 +102,7 @@ class SpeciesEnvironmentQueryTool(BaseTool):
         """执行查询逻辑，并根据目标水质计算适应性打分。"""
         try:
             normalized = strain.strip()
-            results = self._query_environment(normalized)
+            results = self._query_environment(normalized, oxygen=oxygen)
             if not results:
                 return {
                     "status": "not_found",
@@ -141,30 +142,46 @@ class SpeciesEnvironmentQueryTool(BaseTool):
                 "message": f"处理查询结果时发生错误: {exc}",
             }
 
-    def _query_environment(self, strain: str) -> List[Dict[str, Any]]:
-        """从数据库中检索给定物种的生长环境信息。"""
+    def _query_environment(
+        self, strain: str, oxygen: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        从数据库中检索给定物种的生长环境信息。
+        指定 oxygen 时在 SQL 中直接排除氧环境明确不符的记录，
+        仅保留完全匹配或未知（NULL/unknown/nan/none）的行；
+        若过滤后没有记录，则去掉氧环境条件重查，保证 not_found 只表示物种不存在，
+        氧环境不符的记录仍按 _oxygen_score 的低分参与评分。
+        """
         table = self._table_obj
         normalized = strain.strip()
-        stmt = (
-            select(table)
-            .where(
-                or_(
-                    func.lower(table.c.strain)
-                    == func.lower(bindparam("exact_strain")),
-                    table.c.strain.ilike(bindparam("pattern")),
-                )
+        params: Dict[str, Any] = {
+            "exact_strain": normalized,
+            "pattern": f"%{normalized}%",
+        }
+        stmt = select(table).where(
+            or_(
+                func.lower(table.c.strain)
+                == func.lower(bindparam("exact_strain")),
+                table.c.strain.ilike(bindparam("pattern")),
             )
-            .limit(25)
         )
+        oxygen_normalized = str(oxygen or "").strip().lower()
         with self._engine.connect() as connection:
-            result = connection.execute(
-                stmt,
-                {
-                    "exact_strain": normalized,
-                    "pattern": f"%{normalized}%",
-                },
-            )
-            rows = result.mappings().all()
+            rows = []
+            if oxygen_normalized:
+                tolerance = func.lower(func.trim(table.c.oxygen_tolerance))
+                oxygen_stmt = stmt.where(
+                    or_(
+                        tolerance == bindparam("oxygen"),
+                        table.c.oxygen_tolerance.is_(None),
+                        tolerance.in_(self._UNKNOWN_OXYGEN),
+                    )
+                ).limit(25)
+                result = connection.execute(oxygen_stmt, {**params, "oxygen": oxygen_normalized})
+                rows = result.mappings().all()
+            if not rows:
+                result = connection.execute(stmt.limit(25), params)
+                rows = result.mappings().all()
         return [dict(row) for row in rows]
 
     def _score_results(
@@ -179,15 +196,15 @@ class SpeciesEnvironmentQueryTool(BaseTool):
         scored: List[Dict[str, Any]] = []
         for record in records:
             clean_record = {k: self._convert_value(v) for k, v in record.items()}
-            score_detail = self._calculate_adaptability(
-                clean_record,
-                temperature=temperature,
-                ph=ph,
-                salinity=salinity,
-                oxygen=oxygen,
+            scored.append(
+                self._calculate_adaptability(
+                    clean_record,
+                    temperature=temperature,
+                    ph=ph,
+                    salinity=salinity,
+                    oxygen=oxygen,
+                )
             )
-            combined = {**clean_record, **score_detail}
-            scored.append(combined)
         scored.sort(key=lambda item: item.get("adaptability_score", 0.0), reverse=True)
         return scored
 
@@ -207,6 +224,7 @@ class SpeciesEnvironmentQueryTool(BaseTool):
         salinity: Optional[float],
         oxygen: Optional[str],
     ) -> Dict[str, Any]:
+        """返回带评分字段的记录副本（一次性构建，避免中间评分字典再合并）。"""
         temp_score = self._bounded_score(
             temperature,
             record.get("temperature_minimum"),
@@ -230,15 +248,11 @@ class SpeciesEnvironmentQueryTool(BaseTool):
         )
 
         adaptability = self._combine_scores(
-            [
-                (temp_score, self._TEMP_WEIGHT),
-                (ph_score, self._PH_WEIGHT),
-                (salinity_score, self._SALINITY_WEIGHT),
-                (oxygen_score, self._OXYGEN_WEIGHT),
-            ]
+            temp_score, ph_score, salinity_score, oxygen_score
         )
 
         return {
+            **record,
             "temperature_score": temp_score,
             "ph_score": ph_score,
             "salinity_score": salinity_score,
@@ -290,24 +304,44 @@ class SpeciesEnvironmentQueryTool(BaseTool):
         recorded = str(recorded_oxygen or "").strip().lower()
         if recorded == normalized_target and recorded:
             return 1.0
-        if recorded in {"", "unknown", "nan", "none"}:
+        if recorded in self._UNKNOWN_OXYGEN:
             return 0.5
         return 0.2
 
-    def _combine_scores(self, scores: List[tuple[Optional[float], float]]) -> float:
+    def _combine_scores(
+        self,
+        temp_score: Optional[float],
+        ph_score: Optional[float],
+        salinity_score: Optional[float],
+        oxygen_score: Optional[float],
+    ) -> float:
+        # 四个维度按固定权重展开计算，缺失维度不计入权重
         numerator = 0.0
         denominator = 0.0
-        for score, weight in scores:
-            if score is None:
-                continue
-            numerator += score * weight
-            denominator += weight
+        if temp_score is not None:
+            numerator += temp_score * self._TEMP_WEIGHT
+            denominator += self._TEMP_WEIGHT
+        if ph_score is not None:
+            numerator += ph_score * self._PH_WEIGHT
+            denominator += self._PH_WEIGHT
+        if salinity_score is not None:
+            numerator += salinity_score * self._SALINITY_WEIGHT
+            denominator += self._SALINITY_WEIGHT
+        if oxygen_score is not None:
+            numerator += oxygen_score * self._OXYGEN_WEIGHT
+            denominator += self._OXYGEN_WEIGHT
         if denominator == 0:
             return 0.0
         return float(numerator / denominator)
 
     @staticmethod
     def _to_float(value: Any) -> Optional[float]:
+        # 先用 type() 精确比较处理最常见的 float/int/Decimal，避免 isinstance 的 MRO 查找
+        value_type = type(value)
+        if value_type is float:
+            return value
+        if value_type is int or value_type is Decimal:
+            return float(value)
         if value is None:
             return None
         if isinstance(value, numbers.Number):
@@ -320,6 +354,4 @@ class SpeciesEnvironmentQueryTool(BaseTool):
                 return float(stripped)
             except ValueError:
                 return None
-        if isinstance(value, Decimal):
-            return float(value)
         return None
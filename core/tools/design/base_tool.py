@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+设计工具共用的 BaseTool 入口
+crewai 缺失时提供简化 BaseTool，回退提示只在进程内以 debug 日志记录一次。
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+_log = logging.getLogger(__name__)
+
+try:
+    from crewai.tools import BaseTool
+except ImportError:  # pragma: no cover - fallback
+    class BaseTool:  # type: ignore
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__()
+
+    _log.debug("crewai 未安装，设计工具将使用简化 BaseTool。")
+
+
+__all__ = ["BaseTool"]
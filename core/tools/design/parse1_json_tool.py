@@ -11,14 +11,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-try:
-    from crewai.tools import BaseTool
-except ImportError:  # pragma: no cover - fallback
-    class BaseTool:  # type: ignore
-        def __init__(self, *args: Any, **kwargs: Any) -> None:
-            super().__init__()
-
-    print("Warning: crewai 未安装，ParseDegradationJSONTool 将使用简化 BaseTool。")
+from .base_tool import BaseTool
 
 from pydantic import BaseModel, Field
 
@@ -9,14 +9,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-try:
-    from crewai.tools import BaseTool
-except ImportError:  # pragma: no cover - fallback
-    class BaseTool:  # type: ignore
-        def __init__(self, *args: Any, **kwargs: Any) -> None:
-            super().__init__()
-
-    print("Warning: crewai 未安装，ScoreCandidateTool 将使用简化 BaseTool。")
+from .base_tool import BaseTool
 
 from pydantic import BaseModel, Field, root_validator
 
@@ -32,8 +25,6 @@ from core.tools.design.score_enzyme_degradation_tool import (
     SpeciesEnzymePayload,
 )
 from core.tools.design.score_single_species_tool import (
-    EnvironmentScoreEntry,
-    EnzymeScoreEntry,
     ScoreSingleSpeciesTool,
     SpeciesEntry,
 )
@@ -207,18 +198,14 @@ class ScoreCandidateTool(BaseTool):
                     for item in species_entries
                     if item.get("strain")
                 ],
-                enzyme_results=[
-                    EnzymeScoreEntry.parse_obj(record)
-                    for record in enzyme_result.get("results", [])
-                ],
-                environment_results=[
-                    EnvironmentScoreEntry.parse_obj(record)
-                    for record in environment_result.get("results", [])
-                ],
+                # 结果来自同进程内的评分工具，结构已知，跳过重复校验
+                enzyme_results=enzyme_result.get("results", []),
+                environment_results=environment_result.get("results", []),
                 weight_kcat=weight_kcat,
                 weight_env=weight_env,
                 weight_enzyme_diversity=weight_enzyme_diversity,
                 top_n=max_records,
+                trusted=True,
             )
             if single_result.get("status") != "success":
                 raise ValueError(single_result.get("message", "单菌综合评分失败"))
@@ -11,26 +11,28 @@ import math
 import numbers
 import os
 from decimal import Decimal
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 try:
-    from crewai.tools import BaseTool
-except ImportError:  # pragma: no cover
-    class BaseTool:  # type: ignore
-        def __init__(self, *args: Any, **kwargs: Any) -> None:
-            super().__init__()
+    import numpy as np
+except ImportError:  # pragma: no cover - 回退到逐行标量评分
+    np = None  # type: ignore[assignment]
 
-    print("Warning: crewai 未安装，ScoreEnvironmentTool 将使用简化 BaseTool。")
+from .base_tool import BaseTool
 
 from pydantic import BaseModel, Field, validator
-from sqlalchemy import MetaData, Table, create_engine, func, or_, select
+from sqlalchemy import MetaData, Table, create_engine
 from sqlalchemy.engine import Engine, URL
 from sqlalchemy.exc import SQLAlchemyError, NoSuchTableError
-from sqlalchemy.sql import bindparam
+from sqlalchemy.sql import text
 
 from config.config import Config
 
 
+# 按连接 URL 共享的引擎缓存，使多个工具实例复用同一连接池
+_ENGINE_CACHE: Dict[str, Engine] = {}
+
+
 class TargetEnvironment(BaseModel):
     """目标环境参数"""
 
@@ -91,6 +93,11 @@ class ScoreEnvironmentTool(BaseTool):
     _SALINITY_WEIGHT = 0.10
     _OXYGEN_WEIGHT = 0.20
     _TAIL_K = math.log(10)
+    _AXIS_COLUMNS = (
+        ("temperature_minimum", "temperature_optimum_c", "temperature_maximum"),
+        ("ph_minimum", "ph_optimum", "ph_maximum"),
+        ("salinity_minimum", "salinity_optimum", "salinity_maximum"),
+    )
 
     def __init__(self) -> None:
         super().__init__()
@@ -100,13 +107,17 @@ class ScoreEnvironmentTool(BaseTool):
         try:
             table = Table(table_name, metadata, autoload_with=engine)
         except NoSuchTableError as exc:
-            engine.dispose()
             raise RuntimeError(
                 f"未能在数据库中找到表 {table_name}，请先导入环境数据。"
             ) from exc
         object.__setattr__(self, "_engine", engine)
         object.__setattr__(self, "_table_name", table_name)
         object.__setattr__(self, "_table_obj", table)
+        object.__setattr__(
+            self,
+            "_env_batch_stmt",
+            self._build_env_batch_stmt(table, engine.dialect.identifier_preparer),
+        )
 
     def _create_engine(self) -> Engine:
         if Config.DB_TYPE != "postgresql":
@@ -122,7 +133,20 @@ class ScoreEnvironmentTool(BaseTool):
             database=Config.DB_NAME,
             query=query,
         )
-        return create_engine(url)
+        cache_key = url.render_as_string(hide_password=False)
+        engine = _ENGINE_CACHE.get(cache_key)
+        if engine is None:
+            engine = create_engine(
+                url,
+                pool_size=int(os.getenv("ENV_TOOL_POOL_SIZE", "5")),
+                max_overflow=int(os.getenv("ENV_TOOL_MAX_OVERFLOW", "10")),
+                pool_recycle=1800,
+                pool_pre_ping=True,
+                connect_args={"application_name": "score_env_tool"},
+                query_cache_size=1200,
+            )
+            _ENGINE_CACHE[cache_key] = engine
+        return engine
 
     def _run(
         self,
@@ -153,11 +177,13 @@ class ScoreEnvironmentTool(BaseTool):
                     f"target_environment 类型不受支持: {type(target_environment)}。"
                 )
 
-            aggregate: List[Dict[str, Any]] = []
-            for request in normalized_requests:
-                limit = request.limit or default_limit
-                rows = self._query_environment(request.strain, limit)
+            rows_per_request = self._query_environment_batch(
+                [request.strain for request in normalized_requests],
+                [request.limit or default_limit for request in normalized_requests],
+            )
 
+            aggregate: List[Dict[str, Any]] = []
+            for request, rows in zip(normalized_requests, rows_per_request):
                 if not rows:
                     aggregate.append(
                         {
@@ -169,13 +195,7 @@ class ScoreEnvironmentTool(BaseTool):
                     )
                     continue
 
-                scored_values = [
-                    self._score_record(
-                        record=row,
-                        target=target_env,
-                    )
-                    for row in rows
-                ]
+                scored_values = self._score_records(rows, target=target_env)
 
                 scored_values.sort(reverse=True)
                 best_score = scored_values[0] if scored_values else 0.0
@@ -206,27 +226,180 @@ class ScoreEnvironmentTool(BaseTool):
                 "message": f"环境评分失败: {exc}",
             }
 
-    def _query_environment(self, strain: str, limit: int) -> List[Dict[str, Any]]:
-        table = self._table_obj
-        normalized = strain.strip()
-        stmt = (
-            select(table)
-            .where(
-                or_(
-                    func.lower(table.c.strain)
-                    == func.lower(bindparam("exact_strain")),
-                    table.c.strain.ilike(bindparam("pattern")),
-                )
-            )
-            .limit(max(1, limit))
+    @staticmethod
+    def _build_env_batch_stmt(table: Table, preparer: Any):
+        """
+        构建批量环境查询：unnest 展开物种/行数上限数组，
+        通过 LATERAL 子查询为每个物种单独应用匹配条件与 LIMIT，一次往返取回全部结果。
+        物种名由调用方预先小写，以命中 lower(strain) 表达式索引
+        （见 scripts/create_species_env_indexes.py）；ILIKE 分支本身不区分大小写。
+        """
+        table_sql = preparer.format_table(table)
+        return text(
+            "SELECT req.req_ord, env.* "
+            "FROM unnest(CAST(:strains AS text[]), CAST(:limits AS integer[])) "
+            "WITH ORDINALITY AS req(req_strain, req_lim, req_ord) "
+            "CROSS JOIN LATERAL ("
+            f"SELECT t.* FROM {table_sql} AS t "
+            "WHERE lower(t.strain) = req.req_strain "
+            "OR t.strain ILIKE '%' || req.req_strain || '%' "
+            "LIMIT req.req_lim"
+            ") AS env "
+            "ORDER BY req.req_ord"
         )
+
+    def _query_environment_batch(
+        self, strains: Sequence[str], limits: Sequence[int]
+    ) -> List[List[Dict[str, Any]]]:
+        """一次查询取回多个物种的环境记录，返回值与 strains 顺序一一对应。"""
+        grouped: List[List[Dict[str, Any]]] = [[] for _ in strains]
+        if not grouped:
+            return grouped
         with self._engine.connect() as connection:
-            result = connection.execute(
-                stmt,
-                {"exact_strain": normalized, "pattern": f"%{normalized}%"},
+            result = connection.execution_options(
+                stream_results=True, yield_per=64
+            ).execute(
+                self._env_batch_stmt,
+                {
+                    "strains": [strain.strip().lower() for strain in strains],
+                    "limits": [max(1, limit) for limit in limits],
+                },
             )
-            rows = result.mappings().all()
-        return [dict(row) for row in rows]
+            for row in result.mappings():
+                record = dict(row)
+                grouped[record.pop("req_ord") - 1].append(record)
+        return grouped
+
+    def _score_records(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        target: TargetEnvironment,
+    ) -> List[float]:
+        """对同一物种的全部匹配行一次性批量评分（NumPy 不可用时逐行回退）。"""
+        if np is None:
+            return [self._score_record(record=row, target=target) for row in rows]
+
+        # bounds 形状为 (行数, 3 个数值维度, [min, opt, max])，缺失值记为 NaN
+        bounds = np.array(
+            [
+                [
+                    [
+                        np.nan if value is None else value
+                        for value in (self._safe_number(row.get(col)) for col in columns)
+                    ]
+                    for columns in self._AXIS_COLUMNS
+                ]
+                for row in rows
+            ],
+            dtype=np.float64,
+        ).reshape(len(rows), len(self._AXIS_COLUMNS), 3)
+        targets = np.array(
+            [
+                np.nan if value is None else value
+                for value in (
+                    self._safe_number(target.temperature),
+                    self._safe_number(target.ph),
+                    self._safe_number(target.salinity),
+                )
+            ],
+            dtype=np.float64,
+        )
+        axis_scores = self._bounded_scores_batch(
+            targets, bounds[..., 0], bounds[..., 1], bounds[..., 2]
+        )
+
+        oxygen_scores = np.array(
+            [
+                np.nan if value is None else value
+                for value in (
+                    self._oxygen_score(row.get("oxygen_tolerance"), target.oxygen)
+                    for row in rows
+                )
+            ],
+            dtype=np.float64,
+        )
+        scores = np.column_stack([axis_scores, oxygen_scores])
+        weights = np.array(
+            [self._TEMP_WEIGHT, self._PH_WEIGHT, self._SALINITY_WEIGHT, self._OXYGEN_WEIGHT]
+        )
+        present = ~np.isnan(scores)
+        total_weight = present.astype(np.float64) @ weights
+        weighted_sum = np.where(present, scores, 0.0) @ weights
+        combined = np.divide(
+            weighted_sum,
+            total_weight,
+            out=np.zeros_like(weighted_sum),
+            where=total_weight > 0.0,
+        )
+        return [float(round(value, 6)) for value in combined.tolist()]
+
+    def _bounded_scores_batch(
+        self,
+        targets: "np.ndarray",
+        mins: "np.ndarray",
+        opts: "np.ndarray",
+        maxs: "np.ndarray",
+    ) -> "np.ndarray":
+        """`_bounded_score` 的向量化版本，返回值中 NaN 表示该维度不参与加权。"""
+        has_min = ~np.isnan(mins)
+        has_opt = ~np.isnan(opts)
+        has_max = ~np.isnan(maxs)
+        has_target = ~np.isnan(targets)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            baseline = np.where(
+                has_opt,
+                opts,
+                np.where(has_min & has_max, (mins + maxs) / 2, targets),
+            )
+            below = has_min & (targets < mins)
+            above = ~below & has_max & (targets > maxs)
+            tail = self._tail_decay_batch(
+                targets, np.where(below, mins, maxs), baseline
+            )
+
+            rising = self._linear_membership_batch(targets, mins, opts)
+            falling = self._linear_membership_batch(targets, opts, maxs, reverse=True)
+            without_opt = self._linear_membership_batch(targets, mins, maxs)
+
+        with_opt = np.where(
+            has_min & (targets < opts),
+            rising,
+            np.where(has_max & (targets > opts), falling, 1.0),
+        )
+        scores = np.where(
+            has_opt, with_opt, np.where(has_min & has_max, without_opt, np.nan)
+        )
+        scores = np.where(below | above, tail, scores)
+        valid = has_target & (has_min | has_opt | has_max)
+        return np.where(valid, scores, np.nan)
+
+    @staticmethod
+    def _linear_membership_batch(
+        value: "np.ndarray",
+        start: "np.ndarray",
+        end: "np.ndarray",
+        *,
+        reverse: bool = False,
+    ) -> "np.ndarray":
+        span = end - start
+        degenerate = np.abs(span) <= 1e-9 * np.maximum(np.abs(start), np.abs(end))
+        ratio = (end - value) / span if reverse else (value - start) / span
+        return np.where(degenerate, 1.0, np.clip(ratio, 0.0, 1.0))
+
+    def _tail_decay_batch(
+        self, value: "np.ndarray", boundary: "np.ndarray", optimum: "np.ndarray"
+    ) -> "np.ndarray":
+        distance = np.abs(value - boundary)
+        span = np.abs(optimum - boundary)
+        span = np.where(span == 0.0, 1.0, span)
+        ratio = distance / span
+        if Config.ENV_SCORE_FAST_TAIL:
+            decay = np.reciprocal(1.0 + 10.0 * ratio)
+        else:
+            decay = np.exp(-self._TAIL_K * ratio)
+        return np.round(np.clip(decay, 0.0, 1.0), 6)
 
     def _score_record(
         self,
@@ -258,26 +431,33 @@ class ScoreEnvironmentTool(BaseTool):
         )
 
         env_soft_score = self._combine_scores(
-            [
-                (temp_score, self._TEMP_WEIGHT),
-                (ph_score, self._PH_WEIGHT),
-                (salinity_score, self._SALINITY_WEIGHT),
-                (oxygen_score, self._OXYGEN_WEIGHT),
-            ]
+            temp_score, ph_score, salinity_score, oxygen_score
         )
 
         return env_soft_score
 
     def _combine_scores(
-        self, weighted_scores: Iterable[tuple[Optional[float], float]]
+        self,
+        temp_score: Optional[float],
+        ph_score: Optional[float],
+        salinity_score: Optional[float],
+        oxygen_score: Optional[float],
     ) -> float:
+        # 四个维度按固定权重展开计算，缺失维度不计入权重
         total_weight = 0.0
         weighted_sum = 0.0
-        for score, weight in weighted_scores:
-            if score is None:
-                continue
-            total_weight += weight
-            weighted_sum += score * weight
+        if temp_score is not None:
+            weighted_sum += temp_score * self._TEMP_WEIGHT
+            total_weight += self._TEMP_WEIGHT
+        if ph_score is not None:
+            weighted_sum += ph_score * self._PH_WEIGHT
+            total_weight += self._PH_WEIGHT
+        if salinity_score is not None:
+            weighted_sum += salinity_score * self._SALINITY_WEIGHT
+            total_weight += self._SALINITY_WEIGHT
+        if oxygen_score is not None:
+            weighted_sum += oxygen_score * self._OXYGEN_WEIGHT
+            total_weight += self._OXYGEN_WEIGHT
         if math.isclose(total_weight, 0.0):
             return 0.0
         combined = weighted_sum / total_weight
@@ -375,7 +555,10 @@ class ScoreEnvironmentTool(BaseTool):
         distance = abs(value - boundary)
         span = abs(optimum - boundary) or 1.0
         ratio = distance / span
-        decay = math.exp(-self._TAIL_K * ratio)
+        if Config.ENV_SCORE_FAST_TAIL:
+            decay = 1.0 / (1.0 + 10.0 * ratio)
+        else:
+            decay = math.exp(-self._TAIL_K * ratio)
         return float(round(max(0.0, min(1.0, decay)), 6))
 
     @staticmethod
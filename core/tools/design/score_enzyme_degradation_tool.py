@@ -7,21 +7,57 @@
 from __future__ import annotations
 
 import math
-import statistics
-from typing import Any, Dict, List, Optional
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
-    from crewai.tools import BaseTool
-except ImportError:  # pragma: no cover - fallback
-    class BaseTool:  # type: ignore
-        def __init__(self, *args: Any, **kwargs: Any) -> None:
-            super().__init__()
+    import numpy as np
+except ImportError:  # pragma: no cover - 回退到纯 Python 聚合
+    np = None  # type: ignore[assignment]
 
-    print("Warning: crewai 未安装，ScoreEnzymeDegradationTool 将使用简化 BaseTool。")
+from .base_tool import BaseTool
 
 from pydantic import BaseModel, Field, validator
 
 
+def _build_class_table(classes: Dict[str, str]) -> bytes:
+    """构建 256 字节的 bytes.translate 查找表：命中字符映射为标记字节，其余为 0。"""
+    table = bytearray(256)
+    for chars, marker in classes.items():
+        for char in chars:
+            table[ord(char)] = ord(marker)
+    return bytes(table)
+
+
+# 氨基酸分类：疏水残基 -> H，极性残基 -> P
+_RESIDUE_CLASS_TABLE = _build_class_table({"AVILMFWY": "H", "STNQC": "P"})
+# SMILES 原子分类：芳香碳 -> a，杂原子 N/O/S/P -> X
+_SMILES_CLASS_TABLE = _build_class_table({"c": "a", "NOSP": "X"})
+_DIGIT_RE = re.compile(r"\d")
+
+
+@lru_cache(maxsize=8192)
+def _estimate_kcat_cached(seq: str, smiles: str) -> float:
+    """按 (规范化序列, SMILES) 缓存的 kcat 启发式估算，重复出现的酶序列只计算一次。"""
+    length = len(seq)
+    residue_classes = seq.encode("ascii", "ignore").translate(_RESIDUE_CLASS_TABLE)
+    hydro_count = residue_classes.count(b"H")
+    polar_count = residue_classes.count(b"P")
+
+    smiles_complexity = len(smiles)
+    smiles_classes = smiles.encode("ascii", "ignore").translate(_SMILES_CLASS_TABLE)
+    aromatic_count = smiles_classes.count(b"a")
+    hetero_count = smiles_classes.count(b"X")
+
+    base = 0.05 * length + 0.02 * hydro_count + 0.01 * polar_count
+    modifier = 0.03 * aromatic_count + 0.02 * hetero_count
+    complexity = max(1.0, math.log1p(smiles_complexity))
+
+    kcat = base * complexity + modifier
+    return max(0.1, round(kcat, 4))
+
+
 class SpeciesEnzymePayload(BaseModel):
     """单个微生物的酶序列信息"""
 
@@ -55,7 +91,7 @@ class SpeciesEnzymePayload(BaseModel):
         text = value.strip()
         if not text:
             raise ValueError("存在空的氨基酸序列")
-        if any(char.isdigit() for char in text):
+        if _DIGIT_RE.search(text):
             raise ValueError("氨基酸序列中不应包含数字")
         return text
 
@@ -123,6 +159,14 @@ class ScoreEnzymeDegradationTool(BaseTool):
                         f"species 列表中的元素类型不受支持: {type(entry)}。"
                     )
 
+            # 同一序列可能出现在多个物种中（旁系同源、功能菌/互补菌重复），只估算一次
+            scored = {
+                seq: self._estimate_kcat(seq, pollutant_smiles)
+                for seq in dict.fromkeys(
+                    seq for entry in normalized_species for seq in entry.sequences
+                )
+            }
+
             overall_results: List[Dict[str, Any]] = []
 
             for entry in normalized_species:
@@ -144,18 +188,8 @@ class ScoreEnzymeDegradationTool(BaseTool):
                     )
                     continue
 
-                raw_scores = [
-                    self._estimate_kcat(seq, pollutant_smiles) for seq in sequences
-                ]
-                kcat_max = max(raw_scores)
-                kcat_mean = statistics.mean(raw_scores)
-
-                min_score = min(raw_scores)
-                span = kcat_max - min_score
-                if math.isclose(span, 0.0):
-                    normalized = [1.0 for _ in raw_scores]
-                else:
-                    normalized = [(score - min_score) / span for score in raw_scores]
+                raw_scores = [scored[seq] for seq in sequences]
+                kcat_max, kcat_mean, normalized = self._summarize_scores(raw_scores)
 
                 reference = reference_kcat or kcat_max
                 ratio = kcat_max / reference if reference and reference > 0 else 1.0
@@ -198,30 +232,34 @@ class ScoreEnzymeDegradationTool(BaseTool):
                 "message": f"kcat 估算失败: {exc}",
             }
 
+    @staticmethod
+    def _summarize_scores(raw_scores: List[float]) -> Tuple[float, float, List[float]]:
+        """一次性计算 kcat_max、kcat_mean 以及物种内 min-max 归一化结果。"""
+        if np is not None:
+            scores = np.asarray(raw_scores, dtype=np.float64)
+            kcat_max = float(scores.max())
+            min_score = float(scores.min())
+            kcat_mean = float(scores.mean())
+            span = kcat_max - min_score
+            if math.isclose(span, 0.0):
+                return kcat_max, kcat_mean, [1.0] * len(raw_scores)
+            return kcat_max, kcat_mean, ((scores - min_score) / span).tolist()
+
+        kcat_max = max(raw_scores)
+        kcat_mean = math.fsum(raw_scores) / len(raw_scores)
+        min_score = min(raw_scores)
+        span = kcat_max - min_score
+        if math.isclose(span, 0.0):
+            return kcat_max, kcat_mean, [1.0 for _ in raw_scores]
+        return kcat_max, kcat_mean, [(score - min_score) / span for score in raw_scores]
+
     @staticmethod
     def _estimate_kcat(sequence: str, smiles: str) -> float:
         """
         使用启发式估算 kcat。
         由于缺乏外部模型，这里采用序列长度、氨基酸性质与 SMILES 复杂度的组合。
         """
-        seq = sequence.strip().upper()
-        length = len(seq)
-        hydrophobic_residues = {"A", "V", "I", "L", "M", "F", "W", "Y"}
-        polar_residues = {"S", "T", "N", "Q", "C"}
-
-        hydro_count = sum(1 for ch in seq if ch in hydrophobic_residues)
-        polar_count = sum(1 for ch in seq if ch in polar_residues)
-
-        smiles_complexity = len(smiles)
-        aromatic_count = smiles.count("c")
-        hetero_count = sum(smiles.count(atom) for atom in ["N", "O", "S", "P"])
-
-        base = 0.05 * length + 0.02 * hydro_count + 0.01 * polar_count
-        modifier = 0.03 * aromatic_count + 0.02 * hetero_count
-        complexity = max(1.0, math.log1p(smiles_complexity))
-
-        kcat = base * complexity + modifier
-        return max(0.1, round(kcat, 4))
+        return _estimate_kcat_cached(sequence.strip().upper(), smiles)
 
 
 __all__ = [
@@ -6,17 +6,34 @@
 
 from __future__ import annotations
 
+import hashlib
+import heapq
 import json
 import math
 import os
+import sqlite3
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from itertools import combinations
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 回退到逐条标量计算 Δ
+    np = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 回退到标准库 json
+    orjson = None  # type: ignore[assignment]
 
 from crewai.tools import BaseTool  # type: ignore
 from pydantic import BaseModel, Field, model_validator
-from sqlalchemy import and_, func, or_
+from sqlalchemy import bindparam, func, select, text
 from sqlalchemy.exc import SQLAlchemyError, NoSuchTableError
 from sqlalchemy.orm import sessionmaker
 
@@ -26,6 +43,47 @@ from core.tools.database.complementarity_model import (
 )
 
 
+_NEG_INF = float("-inf")
+
+
+@lru_cache(maxsize=16)
+def _list_json(dir_str: str, mtime_ns: int) -> Tuple[str, ...]:
+    """列出目录下的 *.json（按名称排序）；以目录 mtime 作为缓存失效键。"""
+    del mtime_ns  # 仅参与缓存键
+    with os.scandir(dir_str) as entries:
+        return tuple(
+            sorted(
+                entry.path
+                for entry in entries
+                if entry.name.endswith(".json")
+            )
+        )
+
+
+def _json_files_in(directory: Path) -> List[Path]:
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+        return [Path(item) for item in _list_json(str(directory), mtime_ns)]
+    except OSError:
+        return []
+
+
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    # split()/join 已去除首尾空白并压缩连续空白；实测比 re.sub(r"\s+") 快数倍，
+    # 重复名称由 lru_cache 直接命中
+    return " ".join(name.split())
+
+
+def _delta_or_neg_inf(item: Dict[str, Any]) -> float:
+    """排序键：缺失 Δ 的记录排在最后。"""
+    delta = item.get("delta_index")
+    return delta if delta is not None else _NEG_INF
+
+
+_PAIR_SORT_KEY = attrgetter("sort_key")
+
+
 class ScoreMetabolicInput(BaseModel):
     """互作强度计算输入"""
 
@@ -77,6 +135,27 @@ class ScoreMetabolicInteractionTool(BaseTool):
     )
     args_schema: type[BaseModel] = ScoreMetabolicInput
 
+    # 物种集合记录缓存上限（按缓存的物种集合个数计），超出后整体清空
+    _PAIR_CACHE_MAX = 256
+    # 单条 IN 查询的最大物种数及分块并发查询的线程数
+    _PAIR_QUERY_CHUNK = 500
+    _PAIR_QUERY_WORKERS = 8
+    # 全表行数不超过该上限时一次性载入内存索引，之后的查询不再访问数据库
+    _PAIR_INDEX_MAX_ROWS = 200_000
+    # 跨进程持久化的物种集合记录缓存（SQLite 文件，记录以 JSON 存储），默认关闭；
+    # 设置 METABOLIC_PAIR_CACHE 为文件路径启用，仅在表过大、走 SQL 查询时使用
+    _PAIR_DISK_CACHE_DEFAULT = "off"
+    # 磁盘缓存条目上限，超出后整体清空
+    _PAIR_DISK_CACHE_MAX = 1024
+    _NESTED_KEYS = (
+        "functional_microbes",
+        "functional_records",
+        "species",
+        "species_payload",
+        "records",
+        "members",
+    )
+
     def __init__(self) -> None:
         super().__init__()
         database_url = self._resolve_database_url()
@@ -91,6 +170,10 @@ class ScoreMetabolicInteractionTool(BaseTool):
             raise RuntimeError(f"连接互补性数据库失败: {exc}") from exc
         object.__setattr__(self, "_engine", engine)
         object.__setattr__(self, "_Session", Session)
+        object.__setattr__(self, "_pair_cache", {})
+        object.__setattr__(self, "_pair_index", None)
+        object.__setattr__(self, "_pair_index_ready", False)
+        object.__setattr__(self, "_disk_cache", None)
 
     @staticmethod
     def _resolve_database_url() -> str:
@@ -128,14 +211,16 @@ class ScoreMetabolicInteractionTool(BaseTool):
                     functional_microbes=functional_microbes,
                     include_complements=include_complements,
                 )
-            unique_species = sorted(self._normalize_name(s) for s in microbe_records.species)
+            # MicrobeRecords 中的名称在收集时已规范化，这里无需再次处理
+            unique_species = sorted(microbe_records.species)
             results = self._calculate_pair_metrics(
                 session=session,
                 species_list=unique_species,
                 allowed_species=microbe_records.species,
                 only_positive_delta=only_positive_delta,
             )
-            results = self._sort_and_trim(results, top_n)
+            # 缓存记录已按 Δ 降序排列，过滤后顺序不变，只需截断
+            results = self._sort_and_trim(results, top_n, presorted=True)
             return {
                 "status": "success",
                 "species_included": unique_species,
@@ -174,12 +259,12 @@ class ScoreMetabolicInteractionTool(BaseTool):
             if raw_path.name:
                 candidate_files.append(default_dir / raw_path.name)
             if raw_path.is_dir():
-                candidate_files.extend(sorted(raw_path.glob("*.json")))
+                candidate_files.extend(_json_files_in(raw_path))
 
         if default_dir.exists():
             if raw_path.name:
                 candidate_files.append(default_dir / raw_path.name)
-            candidate_files.extend(sorted(default_dir.glob("*.json")))
+            candidate_files.extend(_json_files_in(default_dir))
 
         for candidate in candidate_files:
             if candidate.is_file():
@@ -228,6 +313,13 @@ class ScoreMetabolicInteractionTool(BaseTool):
             species=species,
         )
 
+    @staticmethod
+    def _read_json(path: str) -> Any:
+        if orjson is not None:
+            return orjson.loads(Path(path).read_bytes())
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
     def _load_microbes(
         self,
         path: Optional[str],
@@ -244,8 +336,7 @@ class ScoreMetabolicInteractionTool(BaseTool):
             )
 
         if path:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self._read_json(path)
             self._collect_microbes(
                 records=records,
                 payload=data,
@@ -265,97 +356,72 @@ class ScoreMetabolicInteractionTool(BaseTool):
         default_source: str = "functional",
         visited: Optional[Set[int]] = None,
     ) -> None:
-        if payload is None:
-            return
-
-        if isinstance(payload, str):
-            name = self._normalize_name(payload)
-            if not name:
-                return
-            if default_source == "complement":
-                if include_complements:
-                    records.complements.add(name)
-                    records.species.add(name)
-            else:
-                records.functional.add(name)
-                records.species.add(name)
-            return
-
+        """
+        以显式栈迭代遍历 JSON 结构收集物种名，避免大规模输入下的深递归。
+        子节点按原递归顺序逆序入栈，遍历顺序与递归实现一致。
+        """
         if visited is None:
             visited = set()
 
-        obj_id = id(payload)
-        if obj_id in visited:
-            return
-        visited.add(obj_id)
-
-        if isinstance(payload, (list, tuple, set)):
-            for item in payload:
-                self._collect_microbes(
-                    records=records,
-                    payload=item,
-                    include_complements=include_complements,
-                    default_source=default_source,
-                    visited=visited,
-                )
-            return
+        stack: Deque[Tuple[Any, str]] = deque([(payload, default_source)])
+        while stack:
+            node, source = stack.pop()
+            if node is None:
+                continue
 
-        if isinstance(payload, dict):
-            strain_value = payload.get("strain")
-            if strain_value:
-                source_hint = str(payload.get("source") or default_source).strip().lower()
-                if source_hint not in {"functional", "complement"}:
-                    source_hint = default_source
-                self._collect_microbes(
-                    records=records,
-                    payload=strain_value,
-                    include_complements=include_complements,
-                    default_source=source_hint,
-                    visited=visited,
-                )
+            if isinstance(node, str):
+                name = self._normalize_name(node)
+                if not name:
+                    continue
+                if source == "complement":
+                    if include_complements:
+                        records.complements.add(name)
+                        records.species.add(name)
+                else:
+                    records.functional.add(name)
+                    records.species.add(name)
+                continue
 
-            complement_candidates: List[Any] = []
-            direct_complements = payload.get("complements")
-            if isinstance(direct_complements, (list, tuple, set)):
-                complement_candidates.extend(direct_complements)
+            obj_id = id(node)
+            if obj_id in visited:
+                continue
+            visited.add(obj_id)
 
-            metadata = payload.get("metadata")
-            if isinstance(metadata, dict):
-                meta_complements = metadata.get("complements")
-                if isinstance(meta_complements, (list, tuple, set)):
-                    complement_candidates.extend(meta_complements)
+            if isinstance(node, (list, tuple, set)):
+                stack.extend((item, source) for item in reversed(list(node)))
+                continue
 
-            if include_complements:
-                for comp in complement_candidates:
-                    self._collect_microbes(
-                        records=records,
-                        payload=comp,
-                        include_complements=include_complements,
-                        default_source="complement",
-                        visited=visited,
-                    )
+            if not isinstance(node, dict):
+                # 其他类型（数字、布尔等）忽略
+                continue
 
-            nested_keys = (
-                "functional_microbes",
-                "functional_records",
-                "species",
-                "species_payload",
-                "records",
-                "members",
+            # 子节点按“嵌套键 → metadata.complements → complements → strain”的逆序直接入栈，
+            # 出栈顺序即原递归顺序，无需中间列表
+            stack.extend(
+                (node[key], source) for key in reversed(self._NESTED_KEYS) if key in node
             )
-            for key in nested_keys:
-                if key in payload:
-                    self._collect_microbes(
-                        records=records,
-                        payload=payload[key],
-                        include_complements=include_complements,
-                        default_source=default_source,
-                        visited=visited,
-                    )
 
-            return
+            if include_complements:
+                metadata = node.get("metadata")
+                if isinstance(metadata, dict):
+                    meta_complements = metadata.get("complements")
+                    if isinstance(meta_complements, (list, tuple, set)):
+                        stack.extend(
+                            (comp, "complement") for comp in reversed(list(meta_complements))
+                        )
+
+                direct_complements = node.get("complements")
+                if isinstance(direct_complements, (list, tuple, set)):
+                    stack.extend(
+                        (comp, "complement") for comp in reversed(list(direct_complements))
+                    )
 
-        # 其他类型（数字、布尔等）忽略
+            strain_value = node.get("strain")
+            if strain_value:
+                source_hint = str(node.get("source") or source).strip().lower()
+                if source_hint not in {"functional", "complement"}:
+                    source_hint = source
+                stack.append((strain_value, source_hint))
 
     def _calculate_pair_metrics(
         self,
@@ -364,62 +430,334 @@ class ScoreMetabolicInteractionTool(BaseTool):
         allowed_species: Set[str],
         only_positive_delta: bool,
     ) -> List[Dict[str, Any]]:
-        normalized = [self._normalize_name(s) for s in species_list]
-        allowed = {self._normalize_name(s) for s in allowed_species}
+        """species_list / allowed_species 均为已规范化的物种名（来自 MicrobeRecords）。"""
         pairs_data: List[Dict[str, Any]] = []
-        for a, b in combinations(normalized, 2):
-            records = self._fetch_pair_records(session, a, b)
-            for record in records:
-                functional_name = self._normalize_name(record.degrading_microorganism)
-                complement_name = self._normalize_name(record.complementary_microorganism)
-                if functional_name not in allowed or complement_name not in allowed:
+        for record in self._cached_pair_records(session, species_list):
+            functional_name = record.functional_species
+            complement_name = record.complement_species
+            if functional_name not in allowed_species or complement_name not in allowed_species:
+                continue
+            delta = record.delta_index
+            if only_positive_delta and (delta is None or delta <= 0.0):
+                continue
+            pairs_data.append(
+                {
+                    "functional_species": functional_name,
+                    "complement_species": complement_name,
+                    "competition_index": record.competition_index,
+                    "complementarity_index": record.complementarity_index,
+                    "delta_index": delta,
+                }
+            )
+        return pairs_data
+
+    def _cached_pair_records(
+        self, session, species: Iterable[str]
+    ) -> List["PairRecord"]:
+        """
+        返回两端物种均在候选集合内的互补性记录，按小写物种集合做实例级缓存，
+        相同物种集合重复调用 _run 时不再访问数据库。
+        记录中的物种名在写入缓存时规范化一次，后续调用直接复用。
+        """
+        cache: Dict[FrozenSet[str], List[PairRecord]] = self._pair_cache  # type: ignore[attr-defined]
+        key = frozenset(name.lower() for name in species)
+        records = cache.get(key)
+        disk_key = None
+        if records is None and self._load_pair_index(session) is None:
+            # 内存索引可用时直接由索引计算；磁盘缓存只用于 SQL 查询路径，
+            # 记录总是取自当前数据库内容，不会把过期索引的结果写到新指纹下
+            disk_key = self._disk_cache_key(session, key)
+            records = self._disk_cache_get(disk_key)
+        if records is None:
+            names: List[Tuple[str, str]] = []
+            complementarity: List[Optional[float]] = []
+            competition: List[Optional[float]] = []
+            for row in self._fetch_pair_records(session, key):
+                functional_name = self._normalize_name(row.degrading_microorganism)
+                complement_name = self._normalize_name(row.complementary_microorganism)
+                if functional_name.lower() == complement_name.lower():
                     continue
-                delta = self._compute_delta(
-                    record.complementarity_index,
-                    record.competition_index,
+                names.append((functional_name, complement_name))
+                complementarity.append(row.complementarity_index)
+                competition.append(row.competition_index)
+            deltas = self._compute_deltas(complementarity, competition)
+            records = [
+                PairRecord(
+                    functional_name,
+                    complement_name,
+                    comp,
+                    compet,
+                    delta,
+                    _NEG_INF if delta is None else delta,
                 )
-                if only_positive_delta and (delta is None or delta <= 0.0):
-                    continue
-                pairs_data.append(
-                    {
-                        "functional_species": functional_name,
-                        "complement_species": complement_name,
-                        "competition_index": record.competition_index,
-                        "complementarity_index": record.complementarity_index,
-                        "delta_index": delta,
-                    }
+                for (functional_name, complement_name), comp, compet, delta in zip(
+                    names, complementarity, competition, deltas
                 )
-        return pairs_data
+            ]
+            # 稳定排序，与对过滤结果按 Δ 降序排序的次序一致
+            records.sort(key=_PAIR_SORT_KEY, reverse=True)
+            self._disk_cache_put(disk_key, records)
+        if key not in cache:
+            if len(cache) >= self._PAIR_CACHE_MAX:
+                cache.clear()
+            cache[key] = records
+        return records
 
-    def _fetch_pair_records(self, session, species_a: str, species_b: str):
-        table = MicrobialComplementarity
-        pattern_a = f"%{species_a}%"
-        pattern_b = f"%{species_b}%"
-        stmt = (
-            session.query(table)
-            .filter(
-                or_(
-                    and_(
-                        func.lower(table.degrading_microorganism).like(
-                            func.lower(pattern_a)
-                        ),
-                        func.lower(table.complementary_microorganism).like(
-                            func.lower(pattern_b)
-                        ),
-                    ),
-                    and_(
-                        func.lower(table.degrading_microorganism).like(
-                            func.lower(pattern_b)
-                        ),
-                        func.lower(table.complementary_microorganism).like(
-                            func.lower(pattern_a)
-                        ),
-                    ),
+    def _disk_cache_path(self) -> Optional[Path]:
+        """磁盘缓存路径；未启用或路径不可写时返回 None（仅使用内存缓存）。"""
+        path = self._disk_cache  # type: ignore[attr-defined]
+        if path is not None:
+            # False 表示已确认不可用
+            return None if path is False else path
+        location = os.getenv("METABOLIC_PAIR_CACHE", self._PAIR_DISK_CACHE_DEFAULT).strip()
+        path = False
+        if location and location.lower() != "off":
+            try:
+                path = Path(location).expanduser()
+                path.parent.mkdir(parents=True, exist_ok=True)
+            except Exception:  # noqa: BLE001
+                path = False
+        object.__setattr__(self, "_disk_cache", path)
+        return None if path is False else path
+
+    @staticmethod
+    @contextmanager
+    def _cache_connection(path: Path):
+        """打开磁盘缓存的 SQLite 连接；多进程并发读写由 SQLite 自身的文件锁处理，退出时提交并关闭。"""
+        conn = sqlite3.connect(str(path), timeout=30)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS pair_cache "
+                    "(key TEXT PRIMARY KEY, records TEXT NOT NULL)"
                 )
-            )
-            .all()
+                yield conn
+        finally:
+            conn.close()
+
+    def _disk_cache_key(self, session, lowered_species: FrozenSet[str]) -> Optional[str]:
+        if self._disk_cache_path() is None:
+            return None
+        # 每次查询都重新取指纹（廉价的元数据查询），数据库内容在进程运行期间被修改也能失效
+        fingerprint = self._database_fingerprint(session)
+        if fingerprint is None:
+            return None
+        digest = hashlib.sha1(fingerprint.encode("utf-8"))
+        for name in sorted(lowered_species):
+            digest.update(b"\0")
+            digest.update(name.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _disk_cache_get(self, disk_key: Optional[str]) -> Optional[List["PairRecord"]]:
+        path = self._disk_cache_path()
+        if path is None or disk_key is None:
+            return None
+        try:
+            with self._cache_connection(path) as conn:
+                row = conn.execute(
+                    "SELECT records FROM pair_cache WHERE key = ?", (disk_key,)
+                ).fetchone()
+            if row is None:
+                return None
+            return [
+                PairRecord(
+                    functional_name,
+                    complement_name,
+                    comp,
+                    compet,
+                    delta,
+                    _NEG_INF if delta is None else delta,
+                )
+                for functional_name, complement_name, comp, compet, delta in json.loads(row[0])
+            ]
+        except Exception:  # noqa: BLE001
+            return None
+
+    def _disk_cache_put(self, disk_key: Optional[str], records: List["PairRecord"]) -> None:
+        path = self._disk_cache_path()
+        if path is None or disk_key is None:
+            return
+        # 只存 JSON 文本，读取时不反序列化任意对象；排序键由 Δ 重新推出
+        payload = json.dumps([record[:5] for record in records])
+        try:
+            with self._cache_connection(path) as conn:
+                (count,) = conn.execute("SELECT count(*) FROM pair_cache").fetchone()
+                if count >= self._PAIR_DISK_CACHE_MAX:
+                    conn.execute("DELETE FROM pair_cache")
+                conn.execute(
+                    "INSERT OR REPLACE INTO pair_cache (key, records) VALUES (?, ?)",
+                    (disk_key, payload),
+                )
+        except Exception:  # noqa: BLE001
+            pass
+
+    def _database_fingerprint(self, session) -> Optional[str]:
+        """
+        数据库内容指纹，只读元数据、不扫描表：SQLite 取文件路径 + mtime + 大小；
+        PostgreSQL 取 pg_stat_user_tables 的插入/更新/删除计数、表文件节点（TRUNCATE 后变化）
+        及统计重置时间（统计信息有数秒的上报延迟）。均附带 URL（不含密码）。
+        其他数据库没有廉价的变更标记，返回 None，不启用磁盘缓存。
+        """
+        url = self._engine.url  # type: ignore[attr-defined]
+        parts = [url.render_as_string(hide_password=True)]
+        database = url.database or ""
+        backend = url.get_backend_name()
+        if backend == "sqlite" and database and database != ":memory:":
+            stat = os.stat(database)
+            parts.extend([os.path.abspath(database), str(stat.st_mtime_ns), str(stat.st_size)])
+        elif backend == "postgresql":
+            row = session.execute(
+                text(
+                    "SELECT s.n_tup_ins, s.n_tup_upd, s.n_tup_del, "
+                    "pg_relation_filenode(s.relid), d.stats_reset "
+                    "FROM pg_stat_user_tables s, pg_stat_database d "
+                    "WHERE s.schemaname = current_schema() AND s.relname = :table "
+                    "AND d.datname = current_database()"
+                ),
+                {"table": MicrobialComplementarity.__tablename__},
+            ).first()
+            if row is None:
+                return None
+            parts.extend(repr(value) for value in row)
+        else:
+            return None
+        return "|".join(parts)
+
+    def _fetch_pair_records(self, session, lowered_species: FrozenSet[str]):
+        """
+        单次查询取回功能菌与互补菌都属于候选物种的记录，
+        直接按行产出物种对，无需枚举全部物种组合。
+        lowered_species 为小写去重后的物种集合：大小写变体在此之前已合并，
+        每个物种只参与一次查找，(a, b)/(b, a) 两个方向的记录各自对应一行、不会重复取回。
+        物种数超过 _PAIR_QUERY_CHUNK 时按功能菌名称分块，由线程池并发查询。
+        """
+        if not lowered_species:
+            return iter(())
+        lowered = sorted(lowered_species)
+        index = self._load_pair_index(session)
+        if index is not None:
+            return [
+                row
+                for name in lowered
+                for comp_lower, row in index.get(name, ())
+                if comp_lower in lowered_species
+            ]
+        if len(lowered) > self._PAIR_QUERY_CHUNK:
+            return self._fetch_pair_records_chunked(lowered, lowered_species)
+        _, pair_stmt, _ = self._pair_statements()
+        return session.execute(
+            pair_stmt,
+            {"species": lowered},
+            execution_options={"yield_per": 500},
+        )
+
+    def _load_pair_index(self, session) -> Optional[Dict[str, List[Tuple[str, Any]]]]:
+        """
+        首次调用时检查表规模，不超过 _PAIR_INDEX_MAX_ROWS 则整表载入，
+        按小写功能菌名称分组为 {deg_lower: [(comp_lower, row), ...]}；
+        表过大时返回 None，由调用方回退到 SQL 查询。
+        """
+        if self._pair_index_ready:  # type: ignore[attr-defined]
+            return self._pair_index  # type: ignore[attr-defined]
+
+        index: Optional[Dict[str, List[Tuple[str, Any]]]] = None
+        total = session.execute(
+            select(func.count()).select_from(MicrobialComplementarity)
+        ).scalar_one()
+        if total <= self._PAIR_INDEX_MAX_ROWS:
+            index = {}
+            full_stmt, _, _ = self._pair_statements()
+            for row in session.execute(full_stmt):
+                deg_lower = row.degrading_microorganism.strip().lower()
+                comp_lower = row.complementary_microorganism.strip().lower()
+                index.setdefault(deg_lower, []).append((comp_lower, row))
+
+        object.__setattr__(self, "_pair_index", index)
+        object.__setattr__(self, "_pair_index_ready", True)
+        return index
+
+    def _fetch_pair_records_chunked(
+        self, lowered: List[str], lowered_species: FrozenSet[str]
+    ) -> List[Any]:
+        """
+        大物种集合的分块查询：避免超长 IN 列表（SQLite 绑定参数上限），
+        各块在独立 Session 中并发执行，互补菌一侧的过滤在 Python 中完成。
+        """
+        chunk_size = self._PAIR_QUERY_CHUNK
+        chunks = [lowered[i : i + chunk_size] for i in range(0, len(lowered), chunk_size)]
+        rows: List[Any] = []
+        with ThreadPoolExecutor(
+            max_workers=min(self._PAIR_QUERY_WORKERS, len(chunks))
+        ) as executor:
+            for chunk_rows in executor.map(self._fetch_pair_chunk, chunks):
+                rows.extend(
+                    row
+                    for row in chunk_rows
+                    if row.complementary_microorganism.strip().lower() in lowered_species
+                )
+        return rows
+
+    def _fetch_pair_chunk(self, chunk: List[str]) -> List[Any]:
+        # Session 非线程安全，每个工作线程使用独立 Session
+        session = self._Session()  # type: ignore[attr-defined]
+        try:
+            _, _, chunk_stmt = self._pair_statements()
+            return session.execute(chunk_stmt, {"species": chunk}).all()
+        finally:
+            session.close()
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _pair_statements():
+        """
+        一次性构建整表 / 双端 IN / 功能菌 IN 三条查询语句；物种列表经 expanding
+        绑定参数传入，语句对象在各次调用间复用，可直接命中 SQLAlchemy 编译缓存。
+        物种名在 Python 侧已转小写，数据库只需对列做 lower(trim())。
+        """
+        table = MicrobialComplementarity
+        degrading = func.lower(func.trim(table.degrading_microorganism))
+        complementary = func.lower(func.trim(table.complementary_microorganism))
+        full_stmt = select(
+            table.degrading_microorganism,
+            table.complementary_microorganism,
+            table.complementarity_index,
+            table.competition_index,
+        )
+        species = bindparam("species", expanding=True)
+        pair_stmt = full_stmt.where(degrading.in_(species), complementary.in_(species))
+        chunk_stmt = full_stmt.where(degrading.in_(species))
+        return full_stmt, pair_stmt, chunk_stmt
+
+    @classmethod
+    def _compute_deltas(
+        cls,
+        complementarity: List[Optional[float]],
+        competition: List[Optional[float]],
+    ) -> List[Optional[float]]:
+        """
+        批量计算 Δ=互补指数-竞争指数，任一侧缺失或为 NaN 时结果为 None；
+        结果与逐条调用 _compute_delta 一致。
+        """
+        if np is None or not complementarity:
+            return [
+                cls._compute_delta(comp, compet)
+                for comp, compet in zip(complementarity, competition)
+            ]
+        count = len(complementarity)
+        comp_arr = np.fromiter(
+            (np.nan if value is None else value for value in complementarity),
+            dtype=np.float64,
+            count=count,
         )
-        return stmt
+        compet_arr = np.fromiter(
+            (np.nan if value is None else value for value in competition),
+            dtype=np.float64,
+            count=count,
+        )
+        invalid = (np.isnan(comp_arr) | np.isnan(compet_arr)).tolist()
+        with np.errstate(invalid="ignore"):
+            deltas = (comp_arr - compet_arr).tolist()
+        return [None if bad else delta for delta, bad in zip(deltas, invalid)]
 
     @staticmethod
     def _compute_delta(
@@ -436,25 +774,37 @@ class ScoreMetabolicInteractionTool(BaseTool):
 
     @staticmethod
     def _normalize_name(name: str) -> str:
-        return " ".join(name.split()).strip()
+        return _normalize_name(name)
 
     @staticmethod
     def _sort_and_trim(
         results: List[Dict[str, Any]],
         top_n: Optional[int],
+        presorted: bool = False,
     ) -> List[Dict[str, Any]]:
-        sorted_results = sorted(
-            results,
-            key=lambda item: (
-                item["delta_index"]
-                if item.get("delta_index") is not None
-                else float("-inf")
-            ),
-            reverse=True,
-        )
+        if presorted:
+            if top_n is not None and top_n > 0:
+                return results[:top_n]
+            return results
         if top_n is not None and top_n > 0:
-            return sorted_results[:top_n]
-        return sorted_results
+            if top_n < len(results) // 2:
+                # 仅需前 N 条时使用堆选择，复杂度 O(R log N)；结果与完整排序后截断一致
+                return heapq.nlargest(top_n, results, key=_delta_or_neg_inf)
+            return sorted(results, key=_delta_or_neg_inf, reverse=True)[:top_n]
+        return sorted(results, key=_delta_or_neg_inf, reverse=True)
+
+
+class PairRecord(NamedTuple):
+    """规范化物种名后的互补性记录"""
+
+    functional_species: str
+    complement_species: str
+    complementarity_index: Optional[float]
+    competition_index: Optional[float]
+    delta_index: Optional[float]
+    # 排序键：缺失 Δ 以 -inf 填充，排序时无需逐条判断 None
+    sort_key: float
+
 
 @dataclass
 class MicrobeRecords:
@@ -8,6 +8,8 @@ AddPathwayTool
 from __future__ import annotations
 
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
@@ -37,6 +39,22 @@ NEW_METABOLITES: Dict[str, Tuple[str, Iterable[str], Optional[str]]] = {
     "h": ("Proton", ["c", "e"], "H"),
 }
 
+# 展开为 (met_id, name, compartment, formula)，模块加载时一次性完成 id 拼接
+_FLAT_METS: Tuple[Tuple[str, str, str, Optional[str]], ...] = tuple(
+    (f"{base_id}_{comp}", name or f"{base_id}_{comp}", comp, formula)
+    for base_id, (name, compartments, formula) in NEW_METABOLITES.items()
+    for comp in compartments
+)
+
+
+def _process_one(src_path: str, dst_path: str) -> str:
+    """读取单个 SBML 模型、补齐 DBP 降解路径并写出；供进程池调用，须为模块级函数。"""
+    model = read_sbml_model(src_path)
+    AddPathwayTool._ensure_metabolites(model)
+    AddPathwayTool._add_dbp_reactions(model)
+    write_sbml_model(model, dst_path)
+    return dst_path
+
 
 class AddPathwayInput(BaseModel):
     """AddPathwayTool 输入参数"""
@@ -94,25 +112,44 @@ class AddPathwayTool(BaseTool):
                 "message": f"未在目录下发现 SBML 模型: {src}",
             }
 
+        # 各模型相互独立：已存在的输出直接复用，其余交给进程池并行解析/写出 SBML
         generated = []
+        pending: List[Tuple[Path, Path]] = []
         for file_path in targets:
             if not file_path.is_file():
                 continue
             out_file = dst / file_path.name
-            if out_file.exists():
-                generated.append(str(out_file))
-                continue
+            generated.append(str(out_file))
+            if not out_file.exists():
+                pending.append((file_path, out_file))
+
+        if len(pending) == 1:
+            file_path, out_file = pending[0]
             try:
-                model = read_sbml_model(str(file_path))
-                self._ensure_metabolites(model)
-                self._add_dbp_reactions(model)
-                write_sbml_model(model, str(out_file))
-                generated.append(str(out_file))
+                _process_one(str(file_path), str(out_file))
             except Exception as exc:  # noqa: BLE001
                 return {
                     "status": "error",
                     "message": f"处理模型 {file_path.name} 失败: {exc}",
                 }
+        elif pending:
+            max_workers = min(len(pending), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    (file_path, executor.submit(_process_one, str(file_path), str(out_file)))
+                    for file_path, out_file in pending
+                ]
+                # 按目标顺序检查结果，报告第一个失败的模型，与串行处理时一致
+                for file_path, future in futures:
+                    try:
+                        future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        for _, other in futures:
+                            other.cancel()
+                        return {
+                            "status": "error",
+                            "message": f"处理模型 {file_path.name} 失败: {exc}",
+                        }
 
         return {
             "status": "success",
@@ -121,68 +158,85 @@ class AddPathwayTool(BaseTool):
             "model_count": len(generated),
         }
 
-    def _ensure_metabolites(self, model: Model) -> None:
-        for base_id, (name, compartments, formula) in NEW_METABOLITES.items():
-            for comp in compartments:
-                met_id = f"{base_id}_{comp}"
-                if met_id in model.metabolites:
-                    continue
-                met = Metabolite(id=met_id, name=name or met_id, compartment=comp)
-                if formula:
-                    met.formula = formula
-                model.add_metabolites([met])
-
-    def _ensure_simple_metabolite(self, model: Model, met_id: str) -> Metabolite:
-        if met_id in model.metabolites:
+    @staticmethod
+    def _ensure_metabolites(model: Model) -> None:
+        # 收集缺失的代谢物后一次性 add_metabolites，只触发一次索引更新
+        existing = model.metabolites
+        to_add: List[Metabolite] = []
+        for met_id, name, comp, formula in _FLAT_METS:
+            if existing.has_id(met_id):
+                continue
+            met = Metabolite(id=met_id, name=name, compartment=comp)
+            if formula:
+                met.formula = formula
+            to_add.append(met)
+        if to_add:
+            model.add_metabolites(to_add)
+
+    @staticmethod
+    def _ensure_simple_metabolite(model: Model, met_id: str) -> Metabolite:
+        # 单次按 id 取值：已存在时不再先 has_id 再 get_by_id 两次查找
+        try:
             return model.metabolites.get_by_id(met_id)
+        except KeyError:
+            pass
         comp = met_id.split("_")[-1] if "_" in met_id else "c"
         met = Metabolite(id=met_id, name=met_id, compartment=comp)
         model.add_metabolites([met])
         return met
 
+    @staticmethod
     def _ensure_reaction(
-        self,
         model: Model,
         rxn_id: str,
         stoich: Dict[str, float],
         lower_bound: float,
         upper_bound: float,
         rxn_name: Optional[str] = None,
+        met_cache: Optional[Dict[str, Metabolite]] = None,
     ) -> Reaction:
         if rxn_id in model.reactions:
             return model.reactions.get_by_id(rxn_id)
-        for met_id in stoich.keys():
-            if met_id not in {m.id for m in model.metabolites}:
-                self._ensure_simple_metabolite(model, met_id)
+        # DictList 按 id 的成员判断与取值均为 O(1)；缺失代谢物在同一次遍历中补齐。
+        # met_cache 在同一模型的多次调用间复用已解析的 Metabolite 对象
+        if met_cache is None:
+            met_cache = {}
+        metabolites: Dict[Metabolite, float] = {}
+        for met_id, coeff in stoich.items():
+            met = met_cache.get(met_id)
+            if met is None:
+                met = AddPathwayTool._ensure_simple_metabolite(model, met_id)
+                met_cache[met_id] = met
+            metabolites[met] = coeff
         rxn = Reaction(rxn_id, name=rxn_name or rxn_id, lower_bound=lower_bound, upper_bound=upper_bound)
-        rxn.add_metabolites({model.metabolites.get_by_id(k): v for k, v in stoich.items()})
+        rxn.add_metabolites(metabolites)
         model.add_reactions([rxn])
         return rxn
 
-    def _add_dbp_reactions(self, model: Model) -> None:
-        self._ensure_reaction(model, "EX_dbp_e", {"dbp_e": -1.0}, -1000.0, 0.0, "DBP exchange (uptake)")
-        self._ensure_reaction(model, "EX_phthalate_e", {"phthalate_e": -1.0}, -1000.0, 1000.0, "Phthalate exchange")
-        self._ensure_reaction(model, "EX_btoh_e", {"btoh_e": -1.0}, -1000.0, 1000.0, "Butanol exchange")
-        self._ensure_reaction(model, "TRANS_o2", {"o2_c": -1.0, "o2_e": 1.0}, -1000.0, 1000.0, "o2 transport c<->e")
-        self._ensure_reaction(model, "TRANS_dbp", {"dbp_c": -1.0, "dbp_e": 1.0}, -1000.0, 1000.0, "DBP transport")
-        self._ensure_reaction(
-            model,
+    @staticmethod
+    def _add_dbp_reactions(model: Model) -> None:
+        met_cache: Dict[str, Metabolite] = {}
+        ensure_reaction = partial(AddPathwayTool._ensure_reaction, model, met_cache=met_cache)
+        ensure_reaction("EX_dbp_e", {"dbp_e": -1.0}, -1000.0, 0.0, "DBP exchange (uptake)")
+        ensure_reaction("EX_phthalate_e", {"phthalate_e": -1.0}, -1000.0, 1000.0, "Phthalate exchange")
+        ensure_reaction("EX_btoh_e", {"btoh_e": -1.0}, -1000.0, 1000.0, "Butanol exchange")
+        ensure_reaction("TRANS_o2", {"o2_c": -1.0, "o2_e": 1.0}, -1000.0, 1000.0, "o2 transport c<->e")
+        ensure_reaction("TRANS_dbp", {"dbp_c": -1.0, "dbp_e": 1.0}, -1000.0, 1000.0, "DBP transport")
+        ensure_reaction(
             "TRANS_phthalate",
             {"phthalate_c": -1.0, "phthalate_e": 1.0},
             -1000.0,
             1000.0,
             "Phthalate transport",
         )
-        self._ensure_reaction(
-            model,
+        ensure_reaction(
             "TRANS_btoh",
             {"btoh_c": -1.0, "btoh_e": 1.0},
             -1000.0,
             1000.0,
             "Butanol transport",
         )
-        self._ensure_reaction(
-            model,
+        ensure_reaction(
             "DBP_HYDRO_BTOH",
             {
                 "dbp_c": -1.0,
@@ -6,15 +6,31 @@ CarveMe 调用封装
 
 from __future__ import annotations
 
+import logging
 import os
+import signal
 import sys
 import subprocess
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from crewai.tools import BaseTool  # type: ignore
 from pydantic import BaseModel, Field
 
+logger = logging.getLogger(__name__)
+
+# 仅保留子进程最近的输出行，长时间批量构建时内存占用有上界
+_OUTPUT_TAIL_LINES = 500
+
+
+def _list_xml_files(directory: Path) -> List[str]:
+    """单次 os.scandir 列出目录下的 *.xml 模型文件（按路径排序），不为每个条目构造 Path。"""
+    with os.scandir(directory) as entries:
+        return sorted(
+            entry.path for entry in entries if entry.name.endswith(".xml") and entry.is_file()
+        )
+
 
 class CarvemeToolInput(BaseModel):
     """CarveMe 工具输入"""
@@ -60,6 +76,10 @@ class CarvemeTool(BaseTool):
         carve_extra: Optional[List[str]] = None,
         validate: bool = False,
     ) -> Dict[str, Any]:
+        """
+        运行构建脚本。子进程的 stderr 合并到 stdout，返回结果中的 stdout
+        为二者合并后的最后 _OUTPUT_TAIL_LINES 行输出。
+        """
         try:
             input_dir = Path(input_path).expanduser()
             output_dir = Path(output_path).expanduser()
@@ -106,30 +126,23 @@ class CarvemeTool(BaseTool):
                 cmd.append("--carve_extra")
                 cmd.extend(carve_extra)
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False,
-            )
+            returncode, output = self._stream_command(cmd)
 
-            if result.returncode != 0:
+            if returncode != 0:
                 return {
                     "status": "error",
                     "message": (
                         "CarveMe 脚本执行失败。\n"
                         f"命令: {' '.join(cmd)}\n"
-                        f"stdout: {result.stdout}\n"
-                        f"stderr: {result.stderr}"
+                        f"stdout/stderr: {output}"
                     ),
                 }
 
-            model_files = sorted(str(p) for p in output_dir.glob("*.xml"))
+            model_files = _list_xml_files(output_dir)
             return {
                 "status": "success",
                 "output_path": str(output_dir),
-                "stdout": result.stdout,
-                "stderr": result.stderr,
+                "stdout": output,
                 "model_files": model_files,
             }
         except Exception as exc:  # noqa: BLE001
@@ -138,5 +151,38 @@ class CarvemeTool(BaseTool):
                 "message": f"CarveMe 调用失败: {exc}",
             }
 
+    @staticmethod
+    def _stream_command(cmd: List[str]) -> Tuple[int, str]:
+        """
+        逐行读取子进程输出（stderr 合并到 stdout）并转发到日志，只保留最后
+        _OUTPUT_TAIL_LINES 行。子进程位于独立会话，调用方中断时整组终止，避免遗留 carve 进程。
+        """
+        tail: Deque[str] = deque(maxlen=_OUTPUT_TAIL_LINES)
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            start_new_session=True,
+        )
+        try:
+            for line in proc.stdout:  # type: ignore[union-attr]
+                tail.append(line)
+                logger.info(line.rstrip())
+            returncode = proc.wait()
+        except BaseException:
+            if proc.poll() is None:
+                if hasattr(os, "killpg"):
+                    os.killpg(proc.pid, signal.SIGTERM)
+                else:  # pragma: no cover - Windows
+                    proc.terminate()
+                proc.wait()
+            raise
+        finally:
+            if proc.stdout is not None:
+                proc.stdout.close()
+        return returncode, "".join(tail)
+
 
 __all__ = ["CarvemeTool", "CarvemeToolInput"]
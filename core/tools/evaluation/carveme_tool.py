@@ -6,13 +6,16 @@ CarveMe FAA 构建工具
 
 from __future__ import annotations
 
+import os
+import shutil
+import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from crewai.tools import BaseTool  # type: ignore
 from pydantic import BaseModel, Field, validator
 
-from core.tools.evaluation.carveme import CarvemeTool
+from core.tools.evaluation.carveme import CarvemeTool, _list_xml_files
 
 DEFAULT_FAA_DIR = (
     Path(__file__).resolve().parents[3]
@@ -90,14 +93,24 @@ class CarvemeModelBuildTool(BaseTool):
                 "message": f"FAA 目录中未找到 .faa 文件：{faa_path}",
             }
 
+        # 一次目录扫描得到已有模型名，代替逐个 FAA 的 exists() 调用
+        with os.scandir(model_path) as entries:
+            existing = {
+                entry.name[: -len(".xml")]
+                for entry in entries
+                if entry.name.endswith(".xml") and entry.is_file()
+            }
+
         targets: List[str] = []
         skipped: List[str] = []
+        pending_faa: List[Path] = []
         for faa_file in faa_files:
             model_file = model_path / f"{faa_file.stem}.xml"
-            if model_file.exists() and not overwrite:
+            if faa_file.stem in existing and not overwrite:
                 skipped.append(str(model_file))
             else:
                 targets.append(str(model_file))
+                pending_faa.append(faa_file)
 
         if not targets:
             return {
@@ -108,17 +121,36 @@ class CarvemeModelBuildTool(BaseTool):
                 "skipped_models": skipped,
             }
 
-        result = self._carveme._run(
-            input_path=str(faa_path),
-            output_path=str(model_path),
-            threads=threads,
-            overwrite=overwrite,
-        )
+        if len(pending_faa) == len(faa_files):
+            result = self._carveme._run(
+                input_path=str(faa_path),
+                output_path=str(model_path),
+                threads=threads,
+                overwrite=overwrite,
+            )
+        else:
+            # 仅部分模型缺失：把待构建的 FAA 链接到临时目录，CarveMe 只处理这些文件；
+            # 构建脚本同样接受 .aa 输入，缺少模型的 .aa 一并链接
+            pending_aa = [
+                aa_file
+                for aa_file in sorted(faa_path.glob("*.aa"))
+                if aa_file.stem not in existing
+            ]
+            with tempfile.TemporaryDirectory(prefix="carveme_faa_") as staging_dir:
+                staged = Path(staging_dir)
+                for faa_file in pending_faa + pending_aa:
+                    self._stage_file(faa_file, staged / faa_file.name)
+                result = self._carveme._run(
+                    input_path=str(staged),
+                    output_path=str(model_path),
+                    threads=threads,
+                    overwrite=overwrite,
+                )
 
         if result.get("status") != "success":
             return result
 
-        model_files = sorted(str(p) for p in model_path.glob("*.xml"))
+        model_files = _list_xml_files(model_path)
         return {
             "status": "success",
             "output_dir": str(model_path),
@@ -126,5 +158,13 @@ class CarvemeModelBuildTool(BaseTool):
             "skipped_models": skipped,
         }
 
+    @staticmethod
+    def _stage_file(source: Path, target: Path) -> None:
+        try:
+            os.symlink(source.resolve(), target)
+        except OSError:
+            # 不支持符号链接的文件系统/平台上退回复制
+            shutil.copy2(source, target)
+
 
 __all__ = ["CarvemeModelBuildTool", "CarvemeModelBuildInput"]
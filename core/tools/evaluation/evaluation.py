@@ -6,9 +6,15 @@
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Callable, ClassVar, Dict, Any, Optional, Tuple
 import re
 import os
+from itertools import product
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - 未安装 pyahocorasick 时使用正则扫描
+    ahocorasick = None
 
 # 获取当前文件所在目录
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +26,29 @@ except ImportError:
     # 如果无法导入配置，使用默认路径
     DEFAULT_MODELS_DIR = os.path.join(current_dir, '..', '..', '..', 'outputs', 'metabolic_models')
 
+# 评价报告中的失败/未达标关键词，模块加载时编译一次；error 不区分大小写
+_FAIL_KEYWORDS = ("无法构建微生物社区", "无法计算", "失败", "未达标", "不达标")
+_FAIL_RE = re.compile("|".join(_FAIL_KEYWORDS + ("error",)), re.IGNORECASE)
+
+
+def _build_fail_automaton():
+    """
+    安装 pyahocorasick 时构建多模式 Aho-Corasick 自动机，对报告只做一次线性扫描。
+    自动机区分大小写，因此显式加入 error 的全部 32 种 ASCII 大小写组合，与 re.IGNORECASE 等价。
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    words = list(_FAIL_KEYWORDS)
+    words.extend("".join(chars) for chars in product(*((c, c.upper()) for c in "error")))
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+_FAIL_AC = _build_fail_automaton()
+
 class AnalyzeEvaluationResultRequest(BaseModel):
     evaluation_report: str = Field(..., description="技术评估专家生成的评价报告")
 
@@ -36,6 +65,25 @@ class AnalyzeCtfbaResultsRequest(BaseModel):
 class EvaluationTool(BaseTool):
     name: str = "EvaluationTool"
     description: str = "实现基于核心标准的评价结果判断逻辑，包括ctFBA结果分析"
+
+    # operation -> (必需参数名, 缺少参数时的提示, 处理函数)
+    _OPERATIONS: ClassVar[Dict[str, Tuple[str, str, Callable[..., Any]]]] = {
+        "analyze_evaluation_result": (
+            "evaluation_report",
+            "缺少评价报告参数",
+            lambda self, value, kwargs: self.analyze_evaluation_result(value),
+        ),
+        "check_core_standards": (
+            "evaluation_report",
+            "缺少评价报告参数",
+            lambda self, value, kwargs: self.check_core_standards(value),
+        ),
+        "analyze_ctfba_results": (
+            "ctfba_results",
+            "缺少ctFBA结果参数",
+            lambda self, value, kwargs: self.analyze_ctfba_results(value, kwargs.get("target_compound")),
+        ),
+    }
     
     def _run(self, operation: str = "", models_dir: str = DEFAULT_MODELS_DIR, **kwargs) -> Dict[Any, Any]:
         """
@@ -58,30 +106,15 @@ class EvaluationTool(BaseTool):
             
             # 如果提供了operation参数，则按旧方式处理以保持向后兼容
             if operation:
-                if operation == "analyze_evaluation_result":
-                    evaluation_report = kwargs.get("evaluation_report")
-                    if not evaluation_report:
-                        return {"status": "error", "message": "缺少评价报告参数"}
-                    result = self.analyze_evaluation_result(evaluation_report)
-                    return {"status": "success", "data": result}
-                    
-                elif operation == "check_core_standards":
-                    evaluation_report = kwargs.get("evaluation_report")
-                    if not evaluation_report:
-                        return {"status": "error", "message": "缺少评价报告参数"}
-                    result = self.check_core_standards(evaluation_report)
-                    return {"status": "success", "data": result}
-                    
-                elif operation == "analyze_ctfba_results":
-                    ctfba_results = kwargs.get("ctfba_results")
-                    target_compound = kwargs.get("target_compound")
-                    if not ctfba_results:
-                        return {"status": "error", "message": "缺少ctFBA结果参数"}
-                    result = self.analyze_ctfba_results(ctfba_results, target_compound)
-                    return {"status": "success", "data": result}
-                    
-                else:
+                spec = self._OPERATIONS.get(operation)
+                if spec is None:
                     return {"status": "error", "message": f"不支持的操作: {operation}"}
+                arg_name, missing_message, handler = spec
+                value = kwargs.get(arg_name)
+                if not value:
+                    return {"status": "error", "message": missing_message}
+                result = handler(self, value, kwargs)
+                return {"status": "success", "data": result}
             else:
                 # 如果没有提供operation参数，直接使用kwargs中的参数
                 if "evaluation_report" in kwargs:
@@ -150,20 +183,11 @@ class EvaluationTool(BaseTool):
         try:
             # 解析评价报告，检查是否包含关键失败信息
             if isinstance(evaluation_report, str):
-                # 检查是否包含失败信息
-                if ("无法构建微生物社区" in evaluation_report or 
-                    "无法计算" in evaluation_report or
-                    "失败" in evaluation_report or
-                    "error" in evaluation_report.lower()):
-                    return False
-                
-                # 检查是否明确提到核心标准未达标
-                if ("未达标" in evaluation_report or
-                    "不达标" in evaluation_report):
-                    return False
-                    
-                # 默认认为如果报告中没有明确的失败信息，则达标
-                return True
+                # 单次扫描检查失败信息或核心标准未达标的表述；
+                # 没有明确的失败信息时默认认为达标
+                if _FAIL_AC is not None:
+                    return next(_FAIL_AC.iter(evaluation_report), None) is None
+                return _FAIL_RE.search(evaluation_report) is None
             else:
                 # 非字符串格式，默认认为达标
                 return True
@@ -214,9 +238,9 @@ class EvaluationTool(BaseTool):
                 "suggestions": "检查模型是否完整"
             }
         
-        # 检查是否有物种生长率为负值或零
-        negative_growth_species = [species for species, growth in species_growth_rates.items() if growth <= 0]
-        if negative_growth_species:
+        # 检查是否有物种生长率为负值或零（正常情况下不构造列表，仅在需要报告时收集）
+        if any(growth <= 0 for growth in species_growth_rates.values()):
+            negative_growth_species = [species for species, growth in species_growth_rates.items() if growth <= 0]
             return {
                 "is_valid": False,
                 "reason": f"以下物种生长率为负值或零: {', '.join(negative_growth_species)}",
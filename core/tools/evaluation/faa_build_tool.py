@@ -7,6 +7,8 @@ FAA 构建工具
 from __future__ import annotations
 
 import os
+import re
+from collections import defaultdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -14,9 +16,8 @@ from crewai.tools import BaseTool  # type: ignore
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field, validator
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 
 load_dotenv()
@@ -28,6 +29,11 @@ DEFAULT_OUTPUT_DIR = (
     / "faa"
 )
 
+# FASTA 序列每行字符数
+_FASTA_LINE_WIDTH = 70
+# 文件名中需替换为 "_" 的字符：\w 与 str.isalnum() 一致（含非 ASCII 字母数字）及下划线
+_SANITIZE_RE = re.compile(r"[^\w.\-]")
+
 
 class FaaBuildInput(BaseModel):
     """FAA 构建工具输入"""
@@ -69,7 +75,6 @@ class FaaBuildTool(BaseTool):
     def __init__(self) -> None:
         super().__init__()
         self._engine: Engine = self._init_engine()
-        self._Session = sessionmaker(bind=self._engine)
 
     def _init_engine(self) -> Engine:
         db_host = os.getenv("DB_HOST")
@@ -80,7 +85,8 @@ class FaaBuildTool(BaseTool):
         if not all([db_host, db_port, db_name, db_user, db_password]):
             raise RuntimeError("数据库配置不完整，请在环境变量中设置 DB_HOST/DB_PORT/DB_NAME/DB_USER/DB_PASSWORD。")
         database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        return create_engine(database_url)
+        # 只读查询直接走连接池，不经过 ORM Session
+        return create_engine(database_url, pool_size=4, pool_pre_ping=True)
 
     def _run(
         self,
@@ -88,7 +94,6 @@ class FaaBuildTool(BaseTool):
         output_dir: Optional[str] = None,
         sequences_per_species: int = 200,
     ) -> Dict[str, Any]:
-        session = None
         try:
             target_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
             target_dir.mkdir(parents=True, exist_ok=True)
@@ -104,27 +109,44 @@ class FaaBuildTool(BaseTool):
             if not unique_species:
                 raise ValueError("未能从输入中识别到有效的物种名称。")
 
-            session = self._Session()
             generated_files: List[str] = []
             missing_species: List[str] = []
             skipped_species: List[str] = []
 
+            # 先排除已有 .faa 的物种；仅当仍有缺失文件时才取连接，一次批量查询取回
+            file_paths = {
+                name: target_dir / f"{self._sanitize_filename(name)}.faa"
+                for name in unique_species
+            }
+            pending = {name for name in unique_species if not file_paths[name].exists()}
+            fetched: Dict[str, List[Dict[str, Any]]] = {}
+            if pending:
+                with self._engine.connect() as conn:
+                    fetched = self._fetch_sequences_batch(conn, list(pending), sequences_per_species)
+
+            written = set()
             for name in unique_species:
-                file_path = target_dir / f"{self._sanitize_filename(name)}.faa"
-                if file_path.exists():
+                file_path = file_paths[name]
+                # 清洗后同名的物种：本次已写出的文件同样视为已存在
+                if name not in pending or file_path in written:
                     skipped_species.append(name)
                     generated_files.append(str(file_path))
                     continue
 
-                sequences = self._fetch_sequences(session, name, sequences_per_species)
+                sequences = fetched.get(name.lower())
                 if not sequences:
                     missing_species.append(name)
                     continue
-                with file_path.open("w", encoding="utf-8") as fh:
-                    for entry in sequences:
-                        header = f">{entry['sequence_id']}|{name}"
-                        fh.write(f"{header}\n")
-                        fh.write(f"{self._wrap_sequence(entry['aa_sequence'])}\n")
+                # 整个文件先在内存中拼好，再一次性写盘
+                buf = bytearray()
+                for entry in sequences:
+                    seq = entry["aa_sequence"].encode("utf-8")
+                    buf += f">{entry['sequence_id']}|{name}\n".encode("utf-8")
+                    for i in range(0, len(seq), _FASTA_LINE_WIDTH):
+                        buf += seq[i : i + _FASTA_LINE_WIDTH]
+                        buf += b"\n"
+                file_path.write_bytes(buf)
+                written.add(file_path)
                 generated_files.append(str(file_path))
 
             return {
@@ -145,49 +167,54 @@ class FaaBuildTool(BaseTool):
                 "status": "error",
                 "message": f"FAA 构建失败: {exc}",
             }
-        finally:
-            if session is not None:
-                session.close()
 
-    def _fetch_sequences(
+    def _fetch_sequences_batch(
         self,
-        session,
-        species_name: str,
+        conn: Connection,
+        species_names: List[str],
         limit: int,
-    ) -> List[Dict[str, Any]]:
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        单次查询取回多个物种的序列：按小写物种名分区、以 sequence_length 降序编号，
+        每个物种保留前 limit 条；换行符在 SQL 中剔除，结果按小写物种名分桶返回。
+        """
         sql = text(
             """
-            SELECT sequence_id, aa_sequence
-            FROM protein_sequences
-            WHERE lower(species_name) = lower(:species)
-            ORDER BY sequence_length DESC
-            LIMIT :limit
+            SELECT species_key, sequence_id, aa_sequence
+            FROM (
+                SELECT
+                    lower(species_name) AS species_key,
+                    sequence_id,
+                    translate(aa_sequence, E'\\r\\n', '') AS aa_sequence,
+                    row_number() OVER (
+                        PARTITION BY lower(species_name)
+                        ORDER BY sequence_length DESC
+                    ) AS rn
+                FROM protein_sequences
+                WHERE lower(species_name) = ANY(:names)
+            ) ranked
+            WHERE rn <= :limit
+            ORDER BY species_key, rn
             """
         )
-        rows = session.execute(sql, {"species": species_name, "limit": limit}).fetchall()
-        sequences: List[Dict[str, Any]] = []
-        for row in rows:
-            seq_id = row[0]
-            aa_seq = row[1]
+        names = sorted({name.lower() for name in species_names})
+        rows = conn.execute(sql, {"names": names, "limit": limit})
+        sequences: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for species_key, seq_id, aa_seq in rows:
             if not aa_seq:
                 continue
-            sequences.append(
-                {"sequence_id": str(seq_id), "aa_sequence": str(aa_seq).replace("\r", "").replace("\n", "")}
+            sequences[species_key].append(
+                {"sequence_id": str(seq_id), "aa_sequence": str(aa_seq)}
             )
         return sequences
 
     @staticmethod
     def _normalize_name(name: str) -> str:
-        return " ".join(name.replace("（", "(").replace("）", ")").split()).strip()
+        return " ".join(name.replace("（", "(").replace("）", ")").split())
 
     @staticmethod
     def _sanitize_filename(name: str) -> str:
-        cleaned = "".join(ch if ch.isalnum() or ch in ("_", "-", ".") else "_" for ch in name)
-        return cleaned.strip("_") or "unknown_species"
-
-    @staticmethod
-    def _wrap_sequence(sequence: str, width: int = 70) -> str:
-        return "\n".join(sequence[i : i + width] for i in range(0, len(sequence), width))
+        return _SANITIZE_RE.sub("_", name).strip("_") or "unknown_species"
 
 
 __all__ = ["FaaBuildTool", "FaaBuildInput"]
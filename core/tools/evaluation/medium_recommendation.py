@@ -324,7 +324,7 @@ class MediumRecommendationTool(BaseTool):
                 # 回退到单模型API
                 from micom.media import complete_medium as single_complete
                 
-                med_series = pd.Series({r: float(v) for r, v in candidate_ex.values})
+                med_series = pd.Series(dict(zip(candidate_ex["reaction"], candidate_ex["flux"].astype(float).tolist())))
                 fixed = single_complete(
                     model=community,
                     medium=med_series,
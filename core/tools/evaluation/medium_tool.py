@@ -10,9 +10,11 @@ import os
 import tempfile
 import shutil
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 from crewai.tools import BaseTool  # type: ignore
 from pydantic import BaseModel, Field, validator
@@ -50,6 +52,38 @@ DEFAULT_MEDIUM_DIR = PROJECT_ROOT / "test_results" / "EvaluateAgent" / "Medium"
 DEFAULT_OUTPUT_CSV = DEFAULT_MEDIUM_DIR / "recommended_medium.csv"
 EXTERNAL_COMPARTMENT_SYNONYMS = {"C_e", "ext", "external", "extracellular"}
 TARGET_EXTERNAL = "e"
+# 推荐上界分档：p75 通量落入 [bins[i-1], bins[i]) 时取 bins[i]，≥ 最后一档时保留原值
+_UPPER_BOUND_BINS = np.array([0.01, 0.1, 1.0, 10.0])
+_SBML_SUFFIXES = (".xml", ".sbml")
+
+
+def _load_and_normalize(sbml_path: str, out_dir: str) -> str:
+    """读取 SBML、统一外液舱室并在 out_dir 下写出副本，返回副本路径。"""
+    name = os.path.splitext(os.path.basename(sbml_path))[0]
+    model = read_sbml_model(sbml_path)
+    model = MediumBuildTool._normalize_external_compartment(model)
+    tmp_sbml = os.path.join(out_dir, f"{name}.xml")
+    write_sbml_model(model, tmp_sbml)
+    return tmp_sbml
+
+
+def _run_model(
+    sbml_path: str,
+    community_growth: float,
+    min_growth: float,
+    max_import: float,
+    candidate_ex: pd.DataFrame,
+    work_dir: str,
+) -> pd.DataFrame:
+    """计算单个模型的培养基需求；供进程池调用，须为模块级函数。"""
+    return MediumBuildTool._run_for_model(
+        sbml_path,
+        community_growth,
+        min_growth,
+        max_import,
+        candidate_ex,
+        work_dir,
+    )
 
 
 class MediumBuildInput(BaseModel):
@@ -119,21 +153,38 @@ class MediumBuildTool(BaseTool):
 
         candidate_df = self._parse_candidate_ex(candidate_ex)
         all_rows: List[pd.DataFrame] = []
-        for sbml in models:
-            try:
-                df = self._run_for_model(
-                    sbml,
-                    community_growth,
-                    min_growth,
-                    max_import,
-                    candidate_df,
-                )
-                all_rows.append(df)
-            except Exception as exc:  # noqa: BLE001
-                return {
-                    "status": "error",
-                    "message": f"模型 {sbml} 计算失败: {exc}",
-                }
+        # 规范化 SBML 副本统一写入本次调用的临时目录，由父进程创建并在结束时清理，
+        # 工作进程异常退出也不会遗留文件
+        work_dir = tempfile.mkdtemp(prefix="cm_sbml_")
+        args = (community_growth, min_growth, max_import, candidate_df, work_dir)
+        try:
+            if len(models) == 1:
+                sbml = models[0]
+                try:
+                    all_rows.append(_run_model(sbml, *args))
+                except Exception as exc:  # noqa: BLE001
+                    return {
+                        "status": "error",
+                        "message": f"模型 {sbml} 计算失败: {exc}",
+                    }
+            else:
+                # 各模型相互独立：交给进程池并行求解
+                max_workers = min(len(models), os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    futures = [(sbml, executor.submit(_run_model, sbml, *args)) for sbml in models]
+                    # 按模型顺序收集结果，报告第一个失败的模型，与串行处理时一致
+                    for sbml, future in futures:
+                        try:
+                            all_rows.append(future.result())
+                        except Exception as exc:  # noqa: BLE001
+                            for _, other in futures:
+                                other.cancel()
+                            return {
+                                "status": "error",
+                                "message": f"模型 {sbml} 计算失败: {exc}",
+                            }
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
 
         if not all_rows:
             return {
@@ -163,11 +214,17 @@ class MediumBuildTool(BaseTool):
 
     @staticmethod
     def _discover_models(model_dir: Path) -> List[str]:
+        """递归列出目录下的 .xml/.sbml（排序）。"""
         paths: List[str] = []
-        for root, _dirs, files in os.walk(model_dir):
-            for fn in files:
-                if fn.lower().endswith((".xml", ".sbml")):
-                    paths.append(os.path.join(root, fn))
+        stack = [str(model_dir)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    # 与 os.walk 一致：不进入指向目录的符号链接
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(_SBML_SUFFIXES):
+                        paths.append(entry.path)
         paths.sort()
         return paths
 
@@ -186,25 +243,23 @@ class MediumBuildTool(BaseTool):
             pairs = [("EX_glc__D_m", 10.0), ("EX_o2_m", 20.0)]
         return pd.DataFrame(pairs, columns=["reaction", "flux"])
 
+    @staticmethod
     def _run_for_model(
-        self,
         sbml_path: str,
         community_growth: float,
         min_growth: float,
         max_import: float,
         candidate_ex: pd.DataFrame,
+        work_dir: str,
     ) -> pd.DataFrame:
         name = os.path.splitext(os.path.basename(sbml_path))[0]
-        tmpd = tempfile.mkdtemp(prefix=f"cm_sbml_{name}_")
+        # 每个模型独占一个子目录，避免不同目录下同名模型互相覆盖
+        tmpd = tempfile.mkdtemp(prefix=f"{name}_", dir=work_dir)
         try:
-            model = read_sbml_model(sbml_path)
-            model = self._normalize_external_compartment(model)
-            tmp_sbml = os.path.join(tmpd, f"{name}.xml")
-            write_sbml_model(model, tmp_sbml)
-
-            com = self._build_singleton_community(tmp_sbml, name)
+            tmp_sbml = _load_and_normalize(sbml_path, tmpd)
+            com = MediumBuildTool._build_singleton_community(tmp_sbml, name)
             if HAVE_WORKFLOW:
-                df = self._run_with_workflow(
+                df = MediumBuildTool._run_with_workflow(
                     com,
                     name,
                     community_growth,
@@ -213,7 +268,7 @@ class MediumBuildTool(BaseTool):
                     candidate_ex,
                 )
             else:
-                df = self._run_with_single_api(
+                df = MediumBuildTool._run_with_single_api(
                     com,
                     name,
                     community_growth,
@@ -284,7 +339,8 @@ class MediumBuildTool(BaseTool):
                 summarize=True,
                 threads=1,
             )
-            out = fixed[["reaction", "flux"]].copy()
+            # 列选择本身已生成新 DataFrame，无需再 copy；flux 统一为 float64
+            out = fixed[["reaction", "flux"]].astype({"flux": np.float64})
             out.insert(0, "model", name)
             return out
         finally:
@@ -299,7 +355,7 @@ class MediumBuildTool(BaseTool):
         max_import: float,
         candidate_ex: pd.DataFrame,
     ) -> pd.DataFrame:
-        med_series = pd.Series({r: float(v) for r, v in candidate_ex.values})
+        med_series = pd.Series(dict(zip(candidate_ex["reaction"], candidate_ex["flux"].astype(float).tolist())))
         fixed = single_complete(
             model=com,
             medium=med_series,
@@ -307,7 +363,7 @@ class MediumBuildTool(BaseTool):
             min_growth=min_growth,
             max_import=max_import,
         )
-        df = pd.DataFrame({"reaction": fixed.index, "flux": fixed.values})
+        df = pd.DataFrame({"reaction": fixed.index, "flux": fixed.to_numpy(dtype=np.float64)})
         df.insert(0, "model", name)
         return df
 
@@ -317,27 +373,28 @@ class MediumBuildTool(BaseTool):
         if df_pos.empty:
             return pd.DataFrame(columns=["reaction", "suggested_upper_bound"])
 
+        # 只统计排序与分档实际用到的量：一次 agg 取 size/mean，再单独求 p75
         grp = df_pos.groupby("reaction")["flux"]
+        agg = grp.agg(["size", "mean"])
         summary = pd.DataFrame(
             {
-                "models_with_need": grp.size(),
-                "mean_flux": grp.mean(),
-                "p50_flux": grp.quantile(0.5),
+                "models_with_need": agg["size"],
+                "mean_flux": agg["mean"],
                 "p75_flux": grp.quantile(0.75),
-                "max_flux": grp.max(),
             }
         ).sort_values(
             ["models_with_need", "p75_flux", "mean_flux"],
             ascending=False,
         )
 
-        v = summary["p75_flux"].astype(float)
-        sug = v.copy()
-        sug = sug.where(v >= 0.01, 0.01)
-        sug = sug.mask((v >= 0.01) & (v < 0.1), 0.1)
-        sug = sug.mask((v >= 0.1) & (v < 1.0), 1.0)
-        sug = sug.mask((v >= 1.0) & (v < 10.0), 10.0)
-        summary["suggested_upper_bound"] = sug.clip(upper=max_import)
+        v = summary["p75_flux"].to_numpy(dtype=np.float64)
+        idx = np.digitize(v, _UPPER_BOUND_BINS)
+        sug = np.where(
+            idx < len(_UPPER_BOUND_BINS),
+            _UPPER_BOUND_BINS[np.minimum(idx, len(_UPPER_BOUND_BINS) - 1)],
+            v,
+        )
+        summary["suggested_upper_bound"] = np.minimum(sug, max_import)
         return summary.reset_index()[["reaction", "suggested_upper_bound"]]
 
 
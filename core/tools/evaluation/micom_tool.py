@@ -6,11 +6,15 @@ MICOM 两步优化工具
 
 from __future__ import annotations
 
+import logging
 import os
+import pickle
 import shutil
 import tempfile
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
@@ -19,16 +23,32 @@ from crewai.tools import BaseTool  # type: ignore
 from pydantic import BaseModel, Field, validator
 
 try:
-    from cobra.io import read_sbml_model, write_sbml_model
+    from cobra.io import read_sbml_model
 except Exception as exc:  # pragma: no cover
     read_sbml_model = None
-    write_sbml_model = None
     COBRA_ERROR = exc
 else:
     COBRA_ERROR = None
 
+try:
+    import pyarrow  # noqa: F401  仅用于判断 pandas 能否使用 pyarrow CSV 引擎
+except ImportError:  # pragma: no cover - 未安装时使用 pandas 默认的 C 引擎
+    pyarrow = None
+
+try:
+    import xlsxwriter
+except ImportError:  # pragma: no cover - 未安装时使用 pandas 默认的 openpyxl
+    xlsxwriter = None
+
+try:
+    from scipy.optimize import brentq
+except ImportError:  # pragma: no cover - scipy 随 micom 安装，缺失时回退到二分查找
+    brentq = None
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+logger = logging.getLogger(__name__)
+
 HAVE_WORKFLOW = False
 try:  # pragma: no cover - 环境判定
     from micom.workflows.media import complete_community_medium as wf_complete
@@ -45,7 +65,10 @@ except Exception:
 else:
     MICOM_ERROR = None
 
+from cobra.exceptions import OptimizationError
 from micom import Community
+from micom.solution import good as GOOD_STATUSES, reset_solver
+from optlang.interface import OPTIMAL
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 DEFAULT_MODEL_DIR = PROJECT_ROOT / "test_results" / "EvaluateAgent" / "Model_pathway"
@@ -60,6 +83,105 @@ EPSILON = 1.0
 BIS_TOL = 1e-3
 MAX_ITER = 30
 MU_TOL = 1e-4
+# 求解器最优性容差，与 micom 设置的可行性容差（1e-6）保持一致；远小于 MU_TOL / BIS_TOL，不影响搜索结果
+SOLVER_OPTIMALITY_TOL = 1e-6
+# 培养基表已规范化（reaction 为去空白字符串、upper 为 float64）的标记，存放在 DataFrame.attrs 中
+_MEDIUM_NORMALIZED = "_normalized"
+_SBML_SUFFIXES = (".xml", ".sbml")
+# 超过该大小的培养基 CSV 改用 pyarrow 引擎解析；小文件上其线程池启动开销反而比 C 引擎慢
+_PYARROW_CSV_MIN_BYTES = 1 << 20
+
+
+# α 扫描工作进程内复用的社区与工具实例（由 _init_alpha_worker 构建），
+# 同一进程内的多个 α 共享工具上的 LP 结果缓存
+_WORKER_COMMUNITY: Optional[Community] = None
+_WORKER_TOOL: Optional["MicomSimulationTool"] = None
+
+
+def _configure_solver(community: Community) -> None:
+    """
+    社区创建后统一设置一次求解器参数。
+    micom 已将可行性容差设为 1e-6、并把 CPLEX/Gurobi 限制为单线程，这里仅补充最优性容差，
+    避免默认的更严容差在小规模 LP 上多做迭代；求解器不支持该参数时保持默认。
+    """
+    try:
+        community.solver.configuration.tolerances.optimality = SOLVER_OPTIMALITY_TOL
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def _init_alpha_worker(tax_records: List[Dict[str, Any]], medium: pd.DataFrame) -> None:
+    """α 扫描进程初始化：每个工作进程只重建一次社区并设置培养基。"""
+    global _WORKER_COMMUNITY, _WORKER_TOOL
+    community = Community(pd.DataFrame(tax_records).set_index("id", drop=False), name="COMM_DBP")
+    _configure_solver(community)
+    tool = MicomSimulationTool()
+    tool._apply_medium_via_micom(community, medium)
+    _WORKER_COMMUNITY = community
+    _WORKER_TOOL = tool
+
+
+@lru_cache(maxsize=16)
+def _growth_column(columns: Tuple[Any, ...]) -> Optional[Any]:
+    """成员表中第一个名称含 growth 的列；同一结构的成员表在 α 扫描与鲁棒性分析中反复出现。"""
+    for c in columns:
+        if "growth" in str(c).lower():
+            return c
+    return None
+
+
+def _prepare_member(src: str, tmpd: str) -> Dict[str, Any]:
+    """读取并规范化单个成员模型，返回 taxonomy 行；供进程池调用，须为模块级函数。"""
+    name = os.path.splitext(os.path.basename(src))[0]
+    model_file = MicomSimulationTool._normalized_model_file(src, name, tmpd)
+    return {
+        "id": name,
+        "file": model_file,
+        "abundance": 1.0,
+        "biomass": None,
+    }
+
+
+def _alpha_one(alpha: float, biomass_max: float) -> Dict[str, Any]:
+    """在工作进程的社区上执行单个 α 的阶段二优化；供进程池调用，须为模块级函数。"""
+    g, f, _ = _WORKER_TOOL._step2_max_dbp_uptake(_WORKER_COMMUNITY, alpha, biomass_max)
+    return {
+        "alpha": alpha,
+        "biomass_max": biomass_max,
+        "growth_at_f": g,
+        "dbp_flux_f": f,
+    }
+
+
+def _robust_one(
+    remove_id: str,
+    tax_records: List[Dict[str, Any]],
+    medium: pd.DataFrame,
+    alpha: float,
+) -> Dict[str, Any]:
+    """移除单个成员后重建社区并执行两步优化；供进程池调用，须为模块级函数。"""
+    nan_row = {"Removal species": remove_id, "DBP flux": float("nan"), "Biomass": float("nan")}
+    records = [row for row in tax_records if str(row["id"]) != str(remove_id)]
+    if not records:
+        return nan_row
+    try:
+        tool = MicomSimulationTool()
+        taxa_new = pd.DataFrame(records).set_index("id", drop=False)
+        com_new = Community(taxa_new, name="COMM_DBP_Robust")
+        _configure_solver(com_new)
+        tool._apply_medium_via_micom(com_new, medium)
+        biomass_rb = tool._step1_max_growth(com_new)
+        if biomass_rb <= 1e-12:
+            return nan_row
+        stage2_growth_rb, dbp_flux_rb, _ = tool._step2_max_dbp_uptake(com_new, alpha, biomass_rb)
+        biomass_stage2_rb = min(stage2_growth_rb, biomass_rb + 1e-6)
+        return {
+            "Removal species": remove_id,
+            "DBP flux": dbp_flux_rb,
+            "Biomass": biomass_stage2_rb,
+        }
+    except Exception:
+        return nan_row
 
 
 class MicomToolInput(BaseModel):
@@ -82,6 +204,10 @@ class MicomToolInput(BaseModel):
         description="自定义 α 列表，逗号分隔，如 0.5,0.6,0.7；仅在 alpha_scan 为 True 时使用",
     )
     robust: bool = Field(default=False, description="是否启用鲁棒性分析（逐一移除成员）")
+    write_xlsx: bool = Field(
+        default=True,
+        description="是否输出 Result_MICOM.xlsx；安装 pyarrow 时各结果表另存为 parquet，未安装时始终输出 xlsx",
+    )
 
     @validator("alpha")
     def validate_alpha(cls, value: float) -> float:
@@ -97,6 +223,12 @@ class MicomSimulationTool(BaseTool):
     description: str = "在推荐培养基下执行 MICOM 两阶段优化，评估社区对 DBP 的摄入能力"
     args_schema: type[BaseModel] = MicomToolInput
 
+    def __init__(self) -> None:
+        super().__init__()
+        # (id(社区), 交换反应, 固定通量) -> 最大生长率；以及 (id(社区), 交换反应, "min") -> 最小通量。
+        # 二分查找在不同 α 间会重复访问相同的探测点，设置培养基时清空
+        self._ct_cache: Dict[Tuple[int, str, Any], float] = {}
+
     def _run(
         self,
         model_dir: str,
@@ -106,6 +238,7 @@ class MicomSimulationTool(BaseTool):
         alpha_scan: bool = False,
         alphas: Optional[str] = None,
         robust: bool = False,
+        write_xlsx: bool = True,
     ) -> Dict[str, Any]:
         if COBRA_ERROR:
             return {"status": "error", "message": f"导入 cobra 失败: {COBRA_ERROR}"}
@@ -153,22 +286,40 @@ class MicomSimulationTool(BaseTool):
             alpha_scan_df = None
             if alpha_scan:
                 scan_list = self._parse_alphas(alphas)
-                alpha_scan_df = self._run_alpha_scan(community, biomass_max, scan_list)
+                alpha_scan_df = self._run_alpha_scan(community, biomass_max, scan_list, tax_base, medium)
 
             robust_df = None
             if robust:
                 robust_df = self._run_robust_scan(community, medium, tax_base, alpha)
 
+            # (文件后缀, sheet 名, 结果表)
+            tables: List[Tuple[str, str, pd.DataFrame]] = [("summary", "Simulate result", summary)]
+            mg_df = members_df if isinstance(members_df, pd.DataFrame) else None
+            if mg_df is not None and not mg_df.empty:
+                tables.append(("members", "Microbial growth", mg_df))
+            if alpha_scan_df is not None:
+                tables.append(("alpha_scan", "Alpha scan", alpha_scan_df))
+            if robust_df is not None:
+                tables.append(("robust", "Robust", robust_df))
+
+            # parquet 按列压缩写出，供下游程序读取；xlsx 仅供人工查看，可关闭
+            parquet_files: Dict[str, str] = {}
+            if pyarrow is not None:
+                for key, _sheet, df in tables:
+                    parquet_path = out_dir / f"Result_MICOM.{key}.parquet"
+                    df.to_parquet(parquet_path, index=False)
+                    parquet_files[key] = str(parquet_path)
+
             output_file = out_dir / "Result_MICOM.xlsx"
-            with pd.ExcelWriter(output_file) as writer:
-                summary.to_excel(writer, index=False, sheet_name="Simulate result")
-                mg_df = members_df if isinstance(members_df, pd.DataFrame) else None
-                if mg_df is not None and not mg_df.empty:
-                    mg_df.to_excel(writer, index=False, sheet_name="Microbial growth")
-                if alpha_scan_df is not None:
-                    alpha_scan_df.to_excel(writer, index=False, sheet_name="Alpha scan")
-                if robust_df is not None:
-                    robust_df.to_excel(writer, index=False, sheet_name="Robust")
+            if write_xlsx or not parquet_files:
+                # xlsxwriter 写出更快、占用更少内存；不启用 constant_memory：
+                # pandas 按列写单元格，而该模式要求逐行顺序写入，会丢失数据
+                excel_engine = "xlsxwriter" if xlsxwriter is not None else None
+                with pd.ExcelWriter(output_file, engine=excel_engine) as writer:
+                    for _key, sheet, df in tables:
+                        df.to_excel(writer, index=False, sheet_name=sheet)
+            else:
+                output_file = Path(parquet_files["summary"])
 
             shutil.rmtree(tmpd, ignore_errors=True)
             if alpha_scan_df is not None:
@@ -177,6 +328,7 @@ class MicomSimulationTool(BaseTool):
             return {
                 "status": "success",
                 "output_file": str(output_file),
+                "parquet_files": parquet_files or None,
                 "alpha": alpha,
                 "applied_medium": applied,
                 "missing_medium": missing,
@@ -192,7 +344,8 @@ class MicomSimulationTool(BaseTool):
 
     # ---------- helper functions ----------
     def _read_medium_csv(self, path: Path) -> pd.DataFrame:
-        df = pd.read_csv(path)
+        engine = "pyarrow" if pyarrow is not None and path.stat().st_size >= _PYARROW_CSV_MIN_BYTES else "c"
+        df = pd.read_csv(path, engine=engine)
         if "reaction" not in df.columns:
             raise ValueError("培养基 CSV 必须包含 'reaction' 列")
         if "flux" in df.columns:
@@ -201,30 +354,51 @@ class MicomSimulationTool(BaseTool):
             df = df[["reaction", "suggested_upper_bound"]].rename(columns={"suggested_upper_bound": "upper"})
         else:
             raise ValueError("培养基 CSV 必须包含 'flux' 或 'suggested_upper_bound' 列")
-        df["reaction"] = df["reaction"].astype(str)
-        df["upper"] = pd.to_numeric(df["upper"], errors="coerce").fillna(0.0)
+        df["reaction"] = df["reaction"].astype(str).str.strip()
+        df["upper"] = pd.to_numeric(df["upper"], errors="coerce").fillna(0.0).astype(float)
+        df.attrs[_MEDIUM_NORMALIZED] = True
         return df
 
     def _medium_plus_dbp(self, med: pd.DataFrame, dbp_upper: float) -> pd.DataFrame:
-        med = med.copy()
+        normalized = bool(med.attrs.get(_MEDIUM_NORMALIZED))
         mask = med["reaction"] == DBP_EX_ID
         if mask.any():
+            med = med.copy()
             med.loc[mask, "upper"] = med.loc[mask, "upper"].clip(lower=dbp_upper)
         else:
+            # concat 本身返回新表，无需先复制；按 loc 逐格扩行并不更快（会触发两次扩容）
             med = pd.concat(
                 [med, pd.DataFrame({"reaction": [DBP_EX_ID], "upper": [dbp_upper]})],
                 ignore_index=True,
             )
+        if normalized:
+            # concat 不保留 attrs；追加的 DBP 行同样满足规范化格式
+            med.attrs[_MEDIUM_NORMALIZED] = True
         return med
 
     def _discover_models(self, model_dir: Path) -> List[str]:
         paths: List[str] = []
-        for root, _dirs, files in os.walk(model_dir):
-            for fn in files:
-                if fn.lower().endswith((".xml", ".sbml")):
-                    paths.append(os.path.join(root, fn))
+        stack = [str(model_dir)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    # 与 os.walk 一致：不进入指向目录的符号链接
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(_SBML_SUFFIXES):
+                        paths.append(entry.path)
         paths.sort()
-        return paths
+        # 符号链接等指向同一文件的路径只保留第一个，避免重复解析并重复计入社区成员
+        unique: List[str] = []
+        seen = set()
+        for path in paths:
+            real = os.path.realpath(path)
+            if real in seen:
+                logger.warning("跳过重复的模型文件: %s -> %s", path, real)
+                continue
+            seen.add(real)
+            unique.append(path)
+        return unique
 
     def _build_community_from_dir(self, models_dir: Path) -> Tuple[Community, str, pd.DataFrame, List[str]]:
         model_paths = self._discover_models(models_dir)
@@ -232,32 +406,38 @@ class MicomSimulationTool(BaseTool):
             raise FileNotFoundError(f"未在目录下发现 SBML：{models_dir}")
 
         tmpd = tempfile.mkdtemp(prefix="community_tmp_")
-        rows = []
-        member_names: List[str] = []
         try:
-            for f in model_paths:
-                name = os.path.splitext(os.path.basename(f))[0]
-                member_names.append(name)
-                model = read_sbml_model(f)
-                model = self._normalize_external_compartment(model)
-                tmp_sbml = os.path.join(tmpd, f"{name}.xml")
-                write_sbml_model(model, tmp_sbml)
-                rows.append(
-                    {
-                        "id": name,
-                        "file": tmp_sbml,
-                        "abundance": 1.0,
-                        "biomass": None,
-                    }
-                )
+            if len(model_paths) == 1:
+                rows = [_prepare_member(model_paths[0], tmpd)]
+            else:
+                # SBML 解析为 CPU 密集型，各成员相互独立：交给进程池并行，map 保持原有顺序
+                max_workers = min(len(model_paths), os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    rows = list(executor.map(partial(_prepare_member, tmpd=tmpd), model_paths))
+            member_names: List[str] = [row["id"] for row in rows]
             tax = pd.DataFrame(rows).set_index("id", drop=False)
             community = Community(tax, name="COMM_DBP")
+            _configure_solver(community)
             return community, tmpd, tax, member_names
         except Exception:
             shutil.rmtree(tmpd, ignore_errors=True)
             raise
 
-    def _normalize_external_compartment(self, model):
+    @staticmethod
+    def _normalized_model_file(src: str, name: str, tmpd: str) -> str:
+        """
+        返回统一外液舱室后的成员模型文件路径（位于本次运行的临时目录 tmpd）。
+        以 pickle 而非 SBML 交给 Community 读取，省去 libsbml 的写出与再解析。
+        """
+        model = read_sbml_model(src)
+        model = MicomSimulationTool._normalize_external_compartment(model)
+        target = os.path.join(tmpd, f"{name}.pickle")
+        with open(target, "wb") as fh:
+            pickle.dump(model, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        return target
+
+    @staticmethod
+    def _normalize_external_compartment(model):
         changed = 0
         for met in model.metabolites:
             comp = (met.compartment or "").strip()
@@ -267,17 +447,25 @@ class MicomSimulationTool(BaseTool):
         return model
 
     def _apply_medium_via_micom(self, comm: Community, medium_df: pd.DataFrame) -> Tuple[int, int]:
-        medium_df = medium_df.copy()
-        medium_df["upper"] = pd.to_numeric(medium_df["upper"], errors="coerce").fillna(0.0)
-        pairs = [(str(rid).strip(), float(up)) for rid, up in medium_df.values]
-        applied, missing = 0, 0
+        # 培养基改变后，已缓存的 LP 结果不再有效
+        self._ct_cache.clear()
+        # 列级完成字符串清洗与数值转换（_read_medium_csv 已规范化的表直接取列）；
+        # 成员判断沿用 DictList 的 O(1) 查找，培养基通常只有几十行，而社区反应数以千计，
+        # 预先构建反应 id 集合反而更慢
+        if medium_df.attrs.get(_MEDIUM_NORMALIZED):
+            rids = medium_df["reaction"].tolist()
+            ups = medium_df["upper"].tolist()
+        else:
+            rids = medium_df["reaction"].astype(str).str.strip().tolist()
+            ups = pd.to_numeric(medium_df["upper"], errors="coerce").fillna(0.0).astype(float).tolist()
+        reactions = comm.reactions
         med_dict = {}
-        for rid, up in pairs:
-            if rid in comm.reactions:
+        applied = 0
+        for rid, up in zip(rids, ups):
+            if rid in reactions:
                 med_dict[rid] = up
                 applied += 1
-            else:
-                missing += 1
+        missing = len(rids) - applied
         comm.medium = med_dict
         return applied, missing
 
@@ -289,9 +477,13 @@ class MicomSimulationTool(BaseTool):
             sol = comm.optimize()
             return float(getattr(sol, "growth_rate", getattr(sol, "objective_value", 0.0)) or 0.0)
 
-    @contextmanager
     def _fixed_bound(self, comm: Community, rxn_id: str, value: float):
-        rxn = comm.reactions.get_by_id(rxn_id)
+        return self._fixed_bound_rxn(comm.reactions.get_by_id(rxn_id), value)
+
+    @staticmethod
+    @contextmanager
+    def _fixed_bound_rxn(rxn: Any, value: float):
+        """同 _fixed_bound，但直接接收反应对象，供边界搜索复用同一反应而不必每次按 id 查找。"""
         old_lb, old_ub = rxn.lower_bound, rxn.upper_bound
         try:
             rxn.lower_bound = value
@@ -313,29 +505,68 @@ class MicomSimulationTool(BaseTool):
                 rxn.lower_bound = min(lb, ub)
                 rxn.upper_bound = max(lb, ub)
 
-    def _ct_max_growth_under_ex(self, comm: Community, ex_id: str, f_value: float) -> float:
-        if ex_id not in comm.reactions:
-            return float("nan")
-        with self._fixed_bound(comm, ex_id, f_value):
+    def _ct_max_growth_under_ex(
+        self, comm: Community, ex_id: str, f_value: float, rxn: Optional[Any] = None
+    ) -> float:
+        if rxn is None:
+            if ex_id not in comm.reactions:
+                return float("nan")
+            rxn = comm.reactions.get_by_id(ex_id)
+        key = (id(comm), ex_id, f_value)
+        cached = self._ct_cache.get(key)
+        if cached is not None:
+            return cached
+        with self._fixed_bound_rxn(rxn, f_value):
             try:
-                sol = comm.cooperative_tradeoff(fraction=1.0, fluxes=False)
-                return float(getattr(sol, "growth_rate", getattr(sol, "objective_value", 0.0)) or 0.0)
+                mu = self._community_growth_lp(comm)
             except Exception:
-                return 0.0
-
-    def _unconstrained_min_ex(self, comm: Community, ex_id: str) -> float:
-        if ex_id not in comm.reactions:
-            return float("nan")
-        rxn = comm.reactions.get_by_id(ex_id)
+                mu = 0.0
+        self._ct_cache[key] = mu
+        return mu
+
+    @staticmethod
+    def _community_growth_lp(comm: Community) -> float:
+        """
+        只求解群落生长率 LP，即 cooperative_tradeoff 的第一阶段。
+        fraction=1.0 时，cooperative_tradeoff 后续的 L2 正则 QP 只在成员间分配生长率，
+        群落生长率仍等于该 LP 的最优值，因此探测点无需再构建和求解 QP。
+        两次探测之间模型结构不变、仅改动交换反应边界，求解器可沿用上一次的最优基（warm start）。
+        求解状态的处理与 cooperative_tradeoff 保持一致：失败时重置求解器重试一次，仍失败则抛出
+        OptimizationError；得到可用但非最优的解时回退到 cooperative_tradeoff，由 micom 处理。
+        """
+        with comm:
+            comm.objective = comm.scale * comm.variables.community_objective
+            status = comm.solver.optimize()
+            if status not in GOOD_STATUSES:
+                reset_solver(comm)
+                status = comm.solver.optimize()
+            if status == OPTIMAL:
+                return comm.solver.objective.value / comm.scale
+            if status not in GOOD_STATUSES:
+                raise OptimizationError(f"could not get community growth rate ({status}).")
+        sol = comm.cooperative_tradeoff(fraction=1.0)
+        return float(getattr(sol, "growth_rate", 0.0) or 0.0)
+
+    def _unconstrained_min_ex(self, comm: Community, ex_id: str, rxn: Optional[Any] = None) -> float:
+        if rxn is None:
+            if ex_id not in comm.reactions:
+                return float("nan")
+            rxn = comm.reactions.get_by_id(ex_id)
+        key = (id(comm), ex_id, "min")
+        cached = self._ct_cache.get(key)
+        if cached is not None:
+            return cached
         old_obj, old_dir = comm.objective, comm.objective_direction
         try:
             comm.objective = rxn
             comm.objective_direction = "min"
             sol = comm.optimize()
-            return float(getattr(sol, "objective_value", 0.0) or 0.0)
+            f_min = float(getattr(sol, "objective_value", 0.0) or 0.0)
         finally:
             comm.objective = old_obj
             comm.objective_direction = old_dir
+        self._ct_cache[key] = f_min
+        return f_min
 
     def _step2_max_dbp_uptake(
         self,
@@ -345,66 +576,86 @@ class MicomSimulationTool(BaseTool):
     ) -> Tuple[float, float, Optional[pd.DataFrame]]:
         if DBP_EX_ID not in comm.reactions:
             return float("nan"), float("nan"), None
-
-        f_min = self._unconstrained_min_ex(comm, DBP_EX_ID)
+        # 边界搜索中反复固定同一交换反应，只按 id 查找一次
+        dbp = comm.reactions.get_by_id(DBP_EX_ID)
+
+        f_min = self._unconstrained_min_ex(comm, DBP_EX_ID, dbp)
+        if f_min > -BIS_TOL:
+            # 当前培养基下 DBP 最大摄取量不超过搜索精度（常见于鲁棒性扫描移除关键成员后），
+            # 边界搜索必然收敛到 0，直接在 0 处求解，省去约 MAX_ITER 次 LP
+            return self._tradeoff_at_dbp(comm, 0.0, dbp)
         target = alpha * biomass_max
         f_hi = -float(EPSILON)
-        mu_hi = self._ct_max_growth_under_ex(comm, DBP_EX_ID, f_hi)
+        mu_hi = self._ct_max_growth_under_ex(comm, DBP_EX_ID, f_hi, dbp)
 
         if mu_hi < target - 1e-12:
             left, right = 0.0, f_hi
-            mu_left = self._ct_max_growth_under_ex(comm, DBP_EX_ID, left)
+            mu_left = self._ct_max_growth_under_ex(comm, DBP_EX_ID, left, dbp)
             if mu_left < target - 1e-12:
-                with self._fixed_bound(comm, DBP_EX_ID, 0.0):
-                    sol = comm.cooperative_tradeoff(fraction=1.0, fluxes=True)
-                    g = float(getattr(sol, "growth_rate", getattr(sol, "objective_value", 0.0)) or 0.0)
-                    mg = self._members_growth_table(sol)
-                    return g, 0.0, mg
-            best_f, best_mu = left, mu_left
-            for _ in range(MAX_ITER):
-                mid = 0.5 * (left + right)
-                mu_mid = self._ct_max_growth_under_ex(comm, DBP_EX_ID, mid)
-                if mu_mid >= target:
-                    best_f, best_mu = mid, mu_mid
-                    right = mid
-                else:
-                    left = mid
-                if abs(right - left) <= BIS_TOL or abs(mu_mid - target) <= MU_TOL:
-                    break
-            with self._fixed_bound(comm, DBP_EX_ID, best_f):
-                sol = comm.cooperative_tradeoff(fraction=1.0, fluxes=True)
-                g = float(getattr(sol, "growth_rate", getattr(sol, "objective_value", 0.0)) or 0.0)
-                mg = self._members_growth_table(sol)
-                return g, best_f, mg
+                return self._tradeoff_at_dbp(comm, 0.0, dbp)
+            best_f = self._search_uptake_boundary(comm, left, right, target, dbp)
+            return self._tradeoff_at_dbp(comm, best_f, dbp)
 
         f_left = min(f_min, f_hi)
         f_right = max(f_min, f_hi)
-        mu_left = self._ct_max_growth_under_ex(comm, DBP_EX_ID, f_left)
+        mu_left = self._ct_max_growth_under_ex(comm, DBP_EX_ID, f_left, dbp)
 
         if mu_left < target - 1e-12:
-            left, right = f_left, f_hi
-            best_f, best_mu = f_hi, mu_hi
-            for _ in range(MAX_ITER):
-                mid = 0.5 * (left + right)
-                mu_mid = self._ct_max_growth_under_ex(comm, DBP_EX_ID, mid)
-                if mu_mid >= target:
-                    best_f, best_mu = mid, mu_mid
-                    right = mid
-                else:
-                    left = mid
-                if abs(right - left) <= BIS_TOL or abs(mu_mid - target) <= MU_TOL:
-                    break
-            with self._fixed_bound(comm, DBP_EX_ID, best_f):
-                sol = comm.cooperative_tradeoff(fraction=1.0, fluxes=True)
-                g = float(getattr(sol, "growth_rate", getattr(sol, "objective_value", 0.0)) or 0.0)
-                mg = self._members_growth_table(sol)
-                return g, best_f, mg
-
-        with self._fixed_bound(comm, DBP_EX_ID, f_left):
+            best_f = self._search_uptake_boundary(comm, f_hi, f_left, target, dbp)
+            return self._tradeoff_at_dbp(comm, best_f, dbp)
+
+        return self._tradeoff_at_dbp(comm, f_left, dbp)
+
+    def _tradeoff_at_dbp(
+        self, comm: Community, f_value: float, dbp: Any
+    ) -> Tuple[float, float, Optional[pd.DataFrame]]:
+        """固定 DBP 交换反应 dbp 的通量为 f_value，求解 cooperative_tradeoff 并返回 (群落生长率, 通量, 成员生长表)。"""
+        with self._fixed_bound_rxn(dbp, f_value):
             sol = comm.cooperative_tradeoff(fraction=1.0, fluxes=True)
             g = float(getattr(sol, "growth_rate", getattr(sol, "objective_value", 0.0)) or 0.0)
             mg = self._members_growth_table(sol)
-            return g, f_left, mg
+            return g, f_value, mg
+
+    def _search_uptake_boundary(
+        self,
+        comm: Community,
+        feasible_f: float,
+        infeasible_f: float,
+        target: float,
+        dbp: Any,
+    ) -> float:
+        """
+        在 feasible_f（生长率 ≥ target）与 infeasible_f（生长率 < target）之间寻找临界通量，
+        返回已评估点中满足 target 且离 feasible_f 最远的通量。
+        优先使用 Brent 法（超线性收敛，LP 求解次数更少），不可用时回退到二分查找。
+        """
+        best_f = feasible_f
+
+        def excess(f: float) -> float:
+            nonlocal best_f
+            mu = self._ct_max_growth_under_ex(comm, DBP_EX_ID, f, dbp)
+            if mu >= target and abs(f - feasible_f) > abs(best_f - feasible_f):
+                best_f = f
+            return mu - target
+
+        if brentq is not None:
+            try:
+                brentq(excess, infeasible_f, feasible_f, xtol=BIS_TOL, maxiter=MAX_ITER, disp=False)
+                return best_f
+            except ValueError:
+                pass
+
+        feasible, infeasible = feasible_f, infeasible_f
+        for _ in range(MAX_ITER):
+            mid = 0.5 * (feasible + infeasible)
+            gap = excess(mid)
+            if gap >= 0:
+                feasible = mid
+            else:
+                infeasible = mid
+            if abs(feasible - infeasible) <= BIS_TOL or abs(gap) <= MU_TOL:
+                break
+        return best_f
 
     def _members_growth_table(self, sol: Any) -> Optional[pd.DataFrame]:
         if sol is None:
@@ -418,33 +669,50 @@ class MicomSimulationTool(BaseTool):
             df = df[~df.index.astype(str).str.lower().eq("medium")]
         except Exception:
             pass
-        col = None
-        for c in df.columns:
-            if "growth" in str(c).lower():
-                col = c
-                break
+        col = _growth_column(tuple(df.columns))
         if col is None:
             return None
-        out = pd.DataFrame(
+        # 只对生长率列做一次数值化并填充缺失值，成员名列不会为空
+        growth = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=0.0)
+        return pd.DataFrame(
             {
                 "member": df.index.astype(str),
-                "growth_rate": pd.to_numeric(df[col], errors="coerce"),
-            }
-        ).fillna(0.0)
-        return out
-
-    def _run_alpha_scan(self, comm: Community, biomass_max: float, alphas: Iterable[float]) -> pd.DataFrame:
-        rows = []
-        for a in alphas:
-            g, f, _ = self._step2_max_dbp_uptake(comm, float(a), biomass_max)
-            rows.append(
-                {
-                    "alpha": float(a),
-                    "biomass_max": biomass_max,
-                    "growth_at_f": g,
-                    "dbp_flux_f": f,
-                }
-            )
+                "growth_rate": growth,
+            },
+            index=df.index,
+        )
+
+    def _run_alpha_scan(
+        self,
+        comm: Community,
+        biomass_max: float,
+        alphas: Iterable[float],
+        tax_base: Optional[pd.DataFrame] = None,
+        medium: Optional[pd.DataFrame] = None,
+    ) -> pd.DataFrame:
+        alpha_list = [float(a) for a in alphas]
+        if len(alpha_list) <= 1 or tax_base is None or medium is None:
+            rows = []
+            for a in alpha_list:
+                g, f, _ = self._step2_max_dbp_uptake(comm, a, biomass_max)
+                rows.append(
+                    {
+                        "alpha": a,
+                        "biomass_max": biomass_max,
+                        "growth_at_f": g,
+                        "dbp_flux_f": f,
+                    }
+                )
+            return pd.DataFrame(rows)
+
+        # 各 α 相互独立：社区对象不能跨进程共享，每个工作进程按 taxonomy 记录重建一次后复用
+        max_workers = min(len(alpha_list), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_alpha_worker,
+            initargs=(tax_base.to_dict("records"), medium),
+        ) as executor:
+            rows = list(executor.map(_alpha_one, alpha_list, [biomass_max] * len(alpha_list)))
         return pd.DataFrame(rows)
 
     def _parse_alphas(self, s: Optional[str]) -> List[float]:
@@ -472,31 +740,23 @@ class MicomSimulationTool(BaseTool):
     ) -> Optional[pd.DataFrame]:
         if not isinstance(tax_base, pd.DataFrame) or tax_base.empty or "id" not in tax_base.columns:
             return None
-        results = []
         taxa_ids = tax_base["id"].astype(str).tolist()
-        for remove_id in taxa_ids:
-            taxa_new = tax_base[tax_base["id"].astype(str) != str(remove_id)].copy()
-            if taxa_new.empty:
-                results.append({"Removal species": remove_id, "DBP flux": float("nan"), "Biomass": float("nan")})
-                continue
-            try:
-                com_new = Community(taxa_new, name="COMM_DBP_Robust")
-                self._apply_medium_via_micom(com_new, medium)
-                biomass_rb = self._step1_max_growth(com_new)
-                if biomass_rb <= 1e-12:
-                    results.append({"Removal species": remove_id, "DBP flux": float("nan"), "Biomass": float("nan")})
-                    continue
-                stage2_growth_rb, dbp_flux_rb, _ = self._step2_max_dbp_uptake(com_new, alpha, biomass_rb)
-                biomass_stage2_rb = min(stage2_growth_rb, biomass_rb + 1e-6)
-                results.append(
-                    {
-                        "Removal species": remove_id,
-                        "DBP flux": dbp_flux_rb,
-                        "Biomass": biomass_stage2_rb,
-                    }
+        # 传递 taxonomy 记录而非 Community 对象，各次移除在独立进程中重建社区并求解
+        tax_records = tax_base.to_dict("records")
+        if len(taxa_ids) <= 1:
+            results = [_robust_one(remove_id, tax_records, medium, alpha) for remove_id in taxa_ids]
+        else:
+            max_workers = min(len(taxa_ids), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(
+                    executor.map(
+                        _robust_one,
+                        taxa_ids,
+                        [tax_records] * len(taxa_ids),
+                        [medium] * len(taxa_ids),
+                        [alpha] * len(taxa_ids),
+                    )
                 )
-            except Exception:
-                results.append({"Removal species": remove_id, "DBP flux": float("nan"), "Biomass": float("nan")})
         return pd.DataFrame(results)
 
 
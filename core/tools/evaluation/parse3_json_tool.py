@@ -13,6 +13,15 @@ from typing import Any, Dict, Optional
 from crewai.tools import BaseTool  # type: ignore
 from pydantic import BaseModel, Field
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 回退到标准库 json
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - 未安装 ijson 时整体加载 JSON
+    ijson = None
 
 DEFAULT_DESIGN_RESULT = (
     Path(__file__).resolve().parents[3]
@@ -55,15 +64,19 @@ class ParseDesignConsortiaTool(BaseTool):
             if not path.is_file():
                 raise FileNotFoundError(f"未找到 DesignAgent 结果文件：{path}")
 
-            with path.open("r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            target_id = str(consortium_id).strip()
+            matched_record = self._stream_match(path, target_id)
+            if matched_record is not None:
+                return self._members_result(matched_record)
+
+            # 流式解析未命中（或不可用）时整体加载，沿用原有的格式校验与报错
+            data = self._read_json(path)
 
             records = data.get("records") or []
             if not isinstance(records, list):
                 raise ValueError("DesignAgent JSON 中的 records 字段格式不正确。")
 
-            target_id = str(consortium_id).strip()
-            matched_record: Optional[Dict[str, Any]] = None
+            matched_record = None
             for record in records:
                 record_id = str(record.get("consortium_id", "")).strip()
                 if record_id == target_id:
@@ -73,14 +86,7 @@ class ParseDesignConsortiaTool(BaseTool):
             if matched_record is None:
                 raise ValueError(f"在 {path} 中未找到 consortium_id={target_id} 的记录。")
 
-            members = matched_record.get("members") or []
-            if not isinstance(members, list) or not all(isinstance(item, str) for item in members):
-                raise ValueError("目标记录的 members 字段格式不正确，需为字符串列表。")
-
-            return {
-                "status": "success",
-                "members": members,
-            }
+            return self._members_result(matched_record)
         except Exception as exc:  # noqa: BLE001
             return {
                 "status": "error",
@@ -88,4 +94,42 @@ class ParseDesignConsortiaTool(BaseTool):
             }
 
 
+    @staticmethod
+    def _read_json(path: Path) -> Any:
+        if orjson is not None:
+            return orjson.loads(path.read_bytes())
+        with path.open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+
+    @staticmethod
+    def _stream_match(path: Path, target_id: str) -> Optional[Dict[str, Any]]:
+        """
+        使用 ijson 逐条读取 records，命中目标 consortium 即停止解析。
+        遇到非对象记录或解析异常时返回 None，交由整体加载路径按原逻辑处理。
+        """
+        if ijson is None:
+            return None
+        try:
+            with path.open("rb") as fh:
+                for record in ijson.items(fh, "records.item", use_float=True):
+                    if not isinstance(record, dict):
+                        return None
+                    if str(record.get("consortium_id", "")).strip() == target_id:
+                        return record
+        except Exception:  # noqa: BLE001
+            return None
+        return None
+
+    @staticmethod
+    def _members_result(record: Dict[str, Any]) -> Dict[str, Any]:
+        members = record.get("members") or []
+        if not isinstance(members, list) or not all(isinstance(item, str) for item in members):
+            raise ValueError("目标记录的 members 字段格式不正确，需为字符串列表。")
+
+        return {
+            "status": "success",
+            "members": members,
+        }
+
+
 __all__ = ["ParseDesignConsortiaTool", "ParseConsortiaInput"]
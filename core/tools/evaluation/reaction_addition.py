@@ -149,6 +149,23 @@ class ReactionAdditionTool(BaseTool):
             logger.warning("未找到任何模型文件")
             return {"status": "error", "message": "未找到任何模型文件"}
         
+        # 按列一次性取出反应数据，避免 iterrows 逐行构造 Series；各模型共用
+        reaction_ids = [str(v).replace('.', '_') for v in reactions_df['id'].tolist()]
+        reaction_names = [str(v) for v in reactions_df['name'].tolist()]
+        subsystems = [str(v) for v in reactions_df['subsystem'].tolist()]
+        lower_bounds = reactions_df['lower_bound'].fillna(-1000.0).tolist()
+        upper_bounds = reactions_df['upper_bound'].fillna(1000.0).tolist()
+        reactants_list = reactions_df['reactants'].fillna("").tolist()
+        products_list = reactions_df['products'].fillna("").tolist()
+        if 'target_compound' in reactions_df.columns:
+            target_compounds = reactions_df['target_compound'].tolist()
+        else:
+            target_compounds = [None] * len(reactions_df)
+        reaction_rows = list(zip(
+            reaction_ids, reaction_names, subsystems, lower_bounds, upper_bounds,
+            reactants_list, products_list, target_compounds
+        ))
+
         # 处理每个模型
         results = []
         success_count = 0
@@ -180,34 +197,40 @@ class ReactionAdditionTool(BaseTool):
                     success_count += 1
                     continue
                 
-                # 添加反应到模型
+                # 添加反应到模型：反应 id 用集合判断是否已存在；新反应先暂存，循环结束后一次性加入模型
                 reaction_count = 0
-                for _, row in reactions_df.iterrows():
+                existing_ids = {r.id for r in model.reactions}
+                new_reactions: Dict[str, Any] = {}
+                for reaction_id, reaction_name, subsystem, lower_bound, upper_bound, \
+                        reactants, products, target_compound in reaction_rows:
                     try:
-                        # 创建反应对象
-                        reaction_id = str(row['id']).replace('.', '_')
-                        
                         # 检查反应是否已存在，如果存在则先删除
-                        if reaction_id in [r.id for r in model.reactions]:
+                        if reaction_id in existing_ids:
                             # 删除现有反应
                             reaction_to_remove = model.reactions.get_by_id(reaction_id)
                             model.remove_reactions([reaction_to_remove])
+                            existing_ids.discard(reaction_id)
                             logger.info(f"已删除现有反应: {reaction_id}")
                             reaction_count -= 1  # 减少计数，因为我们要重新添加
+                        elif reaction_id in new_reactions:
+                            # CSV 中重复的反应 id，以后出现的一行为准
+                            del new_reactions[reaction_id]
+                            logger.info(f"已删除现有反应: {reaction_id}")
+                            reaction_count -= 1
                         
                         # 创建反应对象
                         reaction = Reaction(reaction_id)
-                        reaction.name = str(row['name'])
-                        reaction.subsystem = str(row.get('subsystem', ''))
+                        reaction.name = reaction_name
+                        reaction.subsystem = subsystem
                         
                         # 设置反应的上下限
-                        reaction.lower_bound = float(row.get('lower_bound', -1000.0))
-                        reaction.upper_bound = float(row.get('upper_bound', 1000.0))
+                        reaction.lower_bound = float(lower_bound)
+                        reaction.upper_bound = float(upper_bound)
                         
                         # 如果提供了反应物和产物信息，则添加到反应中
-                        if 'reactants' in row and pd.notna(row['reactants']) and row['reactants']:
+                        if reactants:
                             # 解析反应物（格式：metabolite_id:stoichiometry|metabolite_id:stoichiometry）
-                            reactants_str = str(row['reactants'])
+                            reactants_str = str(reactants)
                             if reactants_str:
                                 for reactant_part in reactants_str.split('|'):
                                     if ':' in reactant_part:
@@ -215,7 +238,7 @@ class ReactionAdditionTool(BaseTool):
                                         if len(parts) == 2:
                                             met_id, stoich = parts
                                             # 处理目标化合物的特殊命名
-                                            if 'target_compound' in row and met_id == row['target_compound']:
+                                            if met_id == target_compound:
                                                 actual_met_id = pollutant_name.replace(' ', '_')
                                             else:
                                                 actual_met_id = met_id.strip()
@@ -231,9 +254,9 @@ class ReactionAdditionTool(BaseTool):
                                                 model.add_metabolites(metabolite)
                                             reaction.add_metabolites({metabolite: -abs(float(stoich))})  # 负值表示反应物
                         
-                        if 'products' in row and pd.notna(row['products']) and row['products']:
+                        if products:
                             # 解析产物（格式：metabolite_id:stoichiometry|metabolite_id:stoichiometry）
-                            products_str = str(row['products'])
+                            products_str = str(products)
                             if products_str:
                                 for product_part in products_str.split('|'):
                                     if ':' in product_part:
@@ -257,14 +280,18 @@ class ReactionAdditionTool(BaseTool):
                                                 model.add_metabolites(metabolite)
                                             reaction.add_metabolites({metabolite: abs(float(stoich))})  # 正值表示产物
                         
-                        # 添加反应到模型
-                        model.add_reactions([reaction])
+                        # 暂存反应，循环结束后统一添加到模型
+                        new_reactions[reaction_id] = reaction
                         reaction_count += 1
                         logger.info(f"成功添加反应 {reaction_id}")
                     except Exception as e:
-                        logger.warning(f"添加反应 {row['id']} 失败: {str(e)}")
+                        logger.warning(f"添加反应 {reaction_id} 失败: {str(e)}")
                         continue
                 
+                # 一次性添加全部新反应，避免逐个 add_reactions 反复更新求解器问题
+                if new_reactions:
+                    model.add_reactions(list(new_reactions.values()))
+                
                 # 保存修改后的模型
                 write_sbml_model(model, model_path)
                 
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+为微生物互补性表创建 ScoreMetabolicInteractionTool 查询所需的名称表达式索引
+- lower(trim(degrading_microorganism))
+- lower(trim(complementary_microorganism))
+需要表的所有权，请使用建表账号执行
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tools.database.complementarity_model import create_name_indexes
+
+# 加载环境变量
+load_dotenv()
+
+db_host = os.getenv('DB_HOST')
+db_port = os.getenv('DB_PORT')
+db_name = os.getenv('DB_NAME')
+db_user = os.getenv('DB_USER')
+db_password = os.getenv('DB_PASSWORD')
+
+database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+try:
+    engine = create_engine(database_url)
+    create_name_indexes(engine)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE microbial_complementarity"))
+    print("表 microbial_complementarity 的索引已就绪")
+except Exception as e:
+    print(f"创建索引时发生错误: {e}")
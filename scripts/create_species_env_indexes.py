@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+为环境数据表创建 ScoreEnvironmentTool 查询所需的索引
+- lower(strain) 表达式索引：命中精确匹配分支
+- pg_trgm GIN 索引：加速 strain ILIKE '%x%' 模糊匹配分支
+"""
+
+import os
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+# 加载环境变量
+load_dotenv()
+
+db_host = os.getenv('DB_HOST')
+db_port = os.getenv('DB_PORT')
+db_name = os.getenv('DB_NAME')
+db_user = os.getenv('DB_USER')
+db_password = os.getenv('DB_PASSWORD')
+table_name = os.getenv('SPECIES_ENV_TABLE', 'sheet_species_environment')
+
+database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+LOWER_INDEX = (
+    f'CREATE INDEX IF NOT EXISTS idx_species_env_strain_lower ON "{table_name}" ((lower(strain)))'
+)
+TRGM_STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f'CREATE INDEX IF NOT EXISTS idx_species_env_strain_trgm ON "{table_name}" USING gin (strain gin_trgm_ops)',
+]
+
+try:
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        print(f"执行: {LOWER_INDEX}")
+        connection.execute(text(LOWER_INDEX))
+
+    # pg_trgm 扩展可能未安装，失败时仅跳过模糊匹配索引
+    try:
+        with engine.begin() as connection:
+            for statement in TRGM_STATEMENTS:
+                print(f"执行: {statement}")
+                connection.execute(text(statement))
+    except Exception as e:
+        print(f"跳过 pg_trgm 索引: {e}")
+
+    with engine.begin() as connection:
+        connection.execute(text(f'ANALYZE "{table_name}"'))
+    print(f"表 {table_name} 的索引已就绪")
+except Exception as e:
+    print(f"创建索引时发生错误: {e}")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+测试MicomSimulationTool的群落生长率探测
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("micom")
+
+from cobra.exceptions import OptimizationError  # noqa: E402
+from micom import Community  # noqa: E402
+from micom.data import test_taxonomy  # noqa: E402
+
+from core.tools.evaluation.micom_tool import MicomSimulationTool  # noqa: E402
+
+GLUCOSE_EX = "EX_glc__D_m"
+
+
+@pytest.fixture(scope="module")
+def community():
+    """两个 E. coli core 成员组成的小型社区"""
+    return Community(test_taxonomy(n=2), name="test_micom_tool")
+
+
+@pytest.fixture
+def tool():
+    return MicomSimulationTool()
+
+
+@pytest.mark.parametrize("glucose", [-10.0, -5.0, -1.0])
+def test_probe_growth_matches_cooperative_tradeoff(community, tool, glucose):
+    """探测 LP 的群落生长率应与 cooperative_tradeoff(fraction=1.0) 一致"""
+    with tool._fixed_bound(community, GLUCOSE_EX, glucose):
+        probe = tool._community_growth_lp(community)
+        expected = community.cooperative_tradeoff(fraction=1.0).growth_rate
+    assert probe == pytest.approx(expected, rel=1e-4)
+
+
+def test_probe_infeasible_raises_and_scores_zero(community, tool):
+    """不可行时与 cooperative_tradeoff 一样抛出 OptimizationError，探测结果记为 0"""
+    with tool._fixed_bound(community, GLUCOSE_EX, 0.0):
+        with pytest.raises(OptimizationError):
+            tool._community_growth_lp(community)
+    assert tool._ct_max_growth_under_ex(community, GLUCOSE_EX, 0.0) == 0.0
+
+
+def test_probe_falls_back_to_cooperative_tradeoff(community, tool, monkeypatch):
+    """求解器返回可用但非最优的状态时，回退到 cooperative_tradeoff"""
+    real_optimize = community.solver.optimize
+    calls = []
+
+    def suboptimal_once():
+        status = real_optimize()
+        calls.append(status)
+        return "suboptimal" if len(calls) == 1 else status
+
+    expected = community.cooperative_tradeoff(fraction=1.0).growth_rate
+    monkeypatch.setattr(community.solver, "optimize", suboptimal_once)
+    probe = tool._community_growth_lp(community)
+    assert len(calls) > 1
+    assert probe == pytest.approx(expected, rel=1e-4)
+
+
+class _Reactions(dict):
+    def get_by_id(self, rid):
+        return self[rid]
+
+
+def _stub_growth(monkeypatch, curve):
+    """用分段线性生长曲线替代探测 LP，记录探测点"""
+    probes = []
+
+    def fake_probe(self, comm, ex_id, f_value, rxn=None):
+        probes.append(f_value)
+        return curve(f_value)
+
+    monkeypatch.setattr(MicomSimulationTool, "_ct_max_growth_under_ex", fake_probe)
+    return probes
+
+
+def _steep(f):
+    """摄取 0.625 单位时生长率降到 0.5：临界点位于第一分支的 (-EPSILON, 0) 区间"""
+    return max(0.0, 1.0 + 0.8 * f)
+
+
+def _gentle(f):
+    """摄取 10 单位时生长率降到 0.5：临界点位于第二分支的 (f_min, -EPSILON) 区间"""
+    return max(0.0, 1.0 + 0.05 * f) if f >= -15.0 else 0.0
+
+
+@pytest.mark.parametrize("use_brent", [True, False], ids=["brent", "bisection"])
+@pytest.mark.parametrize(
+    "curve, feasible, infeasible, boundary",
+    [(_steep, 0.0, -1.0, -0.625), (_gentle, -1.0, -30.0, -10.0)],
+    ids=["branch1", "branch2"],
+)
+def test_search_uptake_boundary(monkeypatch, tool, use_brent, curve, feasible, infeasible, boundary):
+    """返回值满足目标生长率，且通量误差不超过 BIS_TOL 或生长率误差不超过 MU_TOL（二分的两条停止条件）"""
+    import core.tools.evaluation.micom_tool as micom_tool
+
+    if not use_brent:
+        monkeypatch.setattr(micom_tool, "brentq", None)
+    probes = _stub_growth(monkeypatch, curve)
+    best_f = tool._search_uptake_boundary(None, feasible, infeasible, 0.5, None)
+    assert curve(best_f) >= 0.5
+    assert abs(best_f - boundary) <= micom_tool.BIS_TOL or curve(best_f) - 0.5 <= micom_tool.MU_TOL
+    assert len(probes) <= micom_tool.MAX_ITER + 2
+
+
+@pytest.mark.parametrize("curve, boundary", [(_steep, -0.625), (_gentle, -10.0)], ids=["branch1", "branch2"])
+def test_step2_max_dbp_uptake_boundary(monkeypatch, tool, curve, boundary):
+    """两个分支都在 DBP 摄取方向上找到临界通量"""
+    import core.tools.evaluation.micom_tool as micom_tool
+
+    _stub_growth(monkeypatch, curve)
+    monkeypatch.setattr(MicomSimulationTool, "_unconstrained_min_ex", lambda self, comm, ex_id, rxn=None: -30.0)
+    monkeypatch.setattr(
+        MicomSimulationTool, "_tradeoff_at_dbp", lambda self, comm, f_value, dbp: (curve(f_value), f_value, None)
+    )
+    comm = type("StubCommunity", (), {"reactions": _Reactions({micom_tool.DBP_EX_ID: object()})})()
+    growth, dbp_flux, _ = tool._step2_max_dbp_uptake(comm, alpha=0.5, biomass_max=1.0)
+    assert growth >= 0.5
+    assert dbp_flux == pytest.approx(boundary, abs=micom_tool.BIS_TOL)